@@ -4,20 +4,54 @@
 @Desc    : LLMCompiler
 @Time    : 2024-08-02 09:30:49
 """
-import inspect
 import logging
-from typing import Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain.callbacks.manager import CallbackManagerForLLMRun, Callbacks
 from langchain.llms.base import LLM
 from langchain.schema import LLMResult, Generation, PromptValue
 
+from llmcompiler.custom_llms.retry import is_retriable, backoff_sleep
+from llmcompiler.custom_llms.response_cache import response_cache_key, get_cached_response, set_cached_response
+from llmcompiler.utils.thread.pool_executor import max_worker
+
+try:
+    import anthropic
+except ImportError:
+    # 仅使用其它模型时无需安装anthropic，首次调用Claude时再提示安装
+    anthropic = None
+
+logger = logging.getLogger(__name__)
+
+# LangChain消息类型到Claude消息角色的映射
+_ROLE_MAP = {"ai": "assistant", "human": "user", "function": "user"}
+# 工具/函数响应转为用户消息时添加的前缀
+_TOOL_RESULT_PREFIX = "工具结果: "
+
+# 复用同一客户端的连接池，避免每次调用重新建立TCP/TLS连接
+_client_cache: Dict[tuple, "anthropic.Anthropic"] = {}
+
+
+def _get_client(timeout: float) -> "anthropic.Anthropic":
+    if anthropic is None:
+        raise ImportError(
+            "The 'anthropic' package is required to use Claude3LLM. Please install it using 'pip install anthropic'.")
+    key = (timeout,)
+    client = _client_cache.get(key)
+    if client is None:
+        # 重试由调用方控制，关闭SDK内置重试
+        client = _client_cache.setdefault(key, anthropic.Anthropic(timeout=timeout, max_retries=0))
+    return client
+
 
 class Claude3LLM(LLM):
     # 温度值
     temperature: float = 0.0
     # 定义模型名称【使用Claude3哪个模型】anthropic.claude-3-sonnet-20240229-v1:0
     model: str = "anthropic.claude-3-haiku-20240307-v1:0"
+    # 单次响应的最大Token数
+    max_tokens: int = 4096
     # 接口重试次数
     max_retries: int = 3
     # 接口超时时间，默认300s
@@ -49,17 +83,16 @@ class Claude3LLM(LLM):
             **kwargs: Any,
     ) -> LLMResult:
         """Run the LLM on the given prompt and input."""
-        # TODO: add caching here.
-        generations = []
-        new_arg_supported = inspect.signature(self._call).parameters.get("run_manager")
-
-        for prompt in prompts:
-            text = (
-                self._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
-                if new_arg_supported
-                else self._call(prompt, stop=stop, **kwargs)
-            )
-            generations.append([Generation(text=text)])
+        def call(prompt) -> str:
+            return self._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
+
+        if len(prompts) > 1:
+            # 各提示词相互独立，并发调用使总耗时接近单次调用耗时
+            with ThreadPoolExecutor(max_workers=max_worker(len(prompts))) as executor:
+                texts = list(executor.map(call, prompts))
+        else:
+            texts = [call(prompt) for prompt in prompts]
+        generations = [[Generation(text=text)] for text in texts]
         return LLMResult(generations=generations)
 
     def _call(
@@ -79,75 +112,74 @@ class Claude3LLM(LLM):
         
         # 调试模式输出请求消息
         if self.debug:
-            logging.info(f"Claude API Messages: {messages}")
+            logger.info("Claude API Messages: %s", messages)
             if system:
-                logging.info(f"Claude API System: {system}")
+                logger.info("Claude API System: %s", system)
+
+        # temperature为0时结果确定，优先命中缓存
+        cache_key = None
+        if self.temperature <= 0:
+            cache_key = response_cache_key(self.model, messages, system, self.temperature,
+                                           max_tokens=self.max_tokens)
+            cached = get_cached_response(cache_key)
+            if cached is not None:
+                return cached
         
         retries = 0
         
-        # 添加Claude API的实际调用
-        import anthropic
-        client = anthropic.Anthropic()
+        client = _get_client(self.timeout)
+
+        # 构建Claude流式请求参数，仅在存在系统提示时传递system
+        request_params = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens
+        }
+        if system:
+            request_params["system"] = system
         
         while retries < self.max_retries:
             try:
-                # 构建Claude请求
-                if system:
-                    response = client.messages.create(
-                        model=self.model,
-                        system=system,
-                        messages=messages,
-                        temperature=self.temperature,
-                        max_tokens=4096
-                    )
-                else:
-                    response = client.messages.create(
-                        model=self.model,
-                        messages=messages,
-                        temperature=self.temperature,
-                        max_tokens=4096
-                    )
-                
-                response_content = response.content[0].text
+                # 分片收集到列表后一次性拼接，避免字符串反复+=拼接
+                with client.messages.stream(**request_params) as s:
+                    response_content = "".join(s.text_stream)
                 
                 # 添加大模型返回数据的日志记录
-                logging.info(f"Claude API Response: {response_content}")
+                logger.info("Claude API Response: %s", response_content)
+
+                if cache_key is not None:
+                    set_cached_response(cache_key, response_content)
                 
                 return response_content
             except Exception as e:
                 retries += 1
+                if not is_retriable(e, (anthropic.APIConnectionError,)):
+                    # 参数错误、鉴权失败等4xx错误重试无意义，直接返回
+                    logger.error("Claude API调用失败: %s", e)
+                    return f"API请求失败: {str(e)}"
                 if retries == self.max_retries:
-                    logging.error(f"Claude API调用失败: {str(e)}")
+                    logger.error("Claude API调用失败: %s", e)
                     return f"API请求在达到最大重试次数后失败: {str(e)}"
-                else:
-                    logging.debug(f"重试Claude API请求... (第{retries}次)")
+                logger.debug("重试Claude API请求... (第%s次)", retries)
+                backoff_sleep(retries)
         
         return "Claude API请求失败"
     
     def pack(self, prompt: PromptValue) -> Tuple[List, Optional[str]]:
         """将提示转换为Claude API格式的消息和系统提示"""
-        messages = []
-        system = None
-        
-        if hasattr(prompt, "to_messages"):
-            mes = prompt.to_messages()
-            for me in mes:
-                if me.type == "system":
-                    system = me.content
-                elif me.type == "ai":
-                    messages.append({"role": "assistant", "content": me.content})
-                elif me.type == "human":
-                    messages.append({"role": "user", "content": me.content})
-                elif me.type == "function":
-                    # 将工具/函数响应转为用户消息
-                    messages.append({"role": "user", "content": f"工具结果: {me.content}"})
-                else:
-                    # 默认作为用户消息
-                    messages.append({"role": "user", "content": me.content})
-        else:
+        if not hasattr(prompt, "to_messages"):
             # 处理字符串提示
-            messages.append({"role": "user", "content": str(prompt)})
-        
+            return [{"role": "user", "content": str(prompt)}], None
+
+        mes = prompt.to_messages()
+        # 系统提示单独传递，工具/函数响应转为用户消息，其余未知类型默认作为用户消息
+        messages = [
+            {"role": _ROLE_MAP.get(me.type, "user"),
+             "content": _TOOL_RESULT_PREFIX + str(me.content) if me.type == "function" else me.content}
+            for me in mes if me.type != "system"
+        ]
+        system = next((me.content for me in reversed(mes) if me.type == "system"), None)
         return messages, system
 
     def debug_prompt(self, debug: bool):
@@ -4,14 +4,39 @@
 @Desc    : DeepSeek LLM Implementation
 @Time    : 2024-08-02 09:30:49
 """
-import inspect
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, List, Optional, Tuple, Mapping, Dict
 
 from langchain.callbacks.manager import CallbackManagerForLLMRun, Callbacks
 from langchain.llms.base import LLM
 from langchain.schema import LLMResult, Generation, PromptValue, SystemMessage, HumanMessage
-from openai import OpenAI
+from openai import OpenAI, APIConnectionError
+
+from llmcompiler.custom_llms.retry import is_retriable, backoff_sleep
+from llmcompiler.custom_llms.response_cache import response_cache_key, get_cached_response, set_cached_response
+from llmcompiler.utils.thread.pool_executor import max_worker
+
+logger = logging.getLogger(__name__)
+
+# LangChain消息类型到OpenAI兼容消息角色的映射
+_ROLE_MAP = {"system": "system", "ai": "assistant", "human": "user", "function": "user"}
+# 工具/函数响应转为用户消息时添加的前缀
+_TOOL_RESULT_PREFIX = "工具结果: "
+
+# 按(api_key, base_url, timeout)复用客户端连接池，避免每次调用重新建立TCP/TLS连接
+_client_cache: Dict[tuple, OpenAI] = {}
+
+
+def _get_client(api_key: Optional[str], base_url: Optional[str], timeout: float) -> OpenAI:
+    key = (api_key, base_url, timeout)
+    client = _client_cache.get(key)
+    if client is None:
+        client_params = {"api_key": api_key, "timeout": timeout, "max_retries": 0}
+        if base_url:
+            client_params["base_url"] = base_url
+        client = _client_cache.setdefault(key, OpenAI(**client_params))
+    return client
 
 
 class DeepSeekLLM(LLM):
@@ -59,16 +84,16 @@ class DeepSeekLLM(LLM):
             **kwargs: Any,
     ) -> LLMResult:
         """运行LLM，处理给定的提示和输入。"""
-        generations = []
-        new_arg_supported = inspect.signature(self._call).parameters.get("run_manager")
-
-        for prompt in prompts:
-            text = (
-                self._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
-                if new_arg_supported
-                else self._call(prompt, stop=stop, **kwargs)
-            )
-            generations.append([Generation(text=text)])
+        def call(prompt) -> str:
+            return self._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
+
+        if len(prompts) > 1:
+            # 各提示词相互独立，并发调用使总耗时接近单次调用耗时
+            with ThreadPoolExecutor(max_workers=max_worker(len(prompts))) as executor:
+                texts = list(executor.map(call, prompts))
+        else:
+            texts = [call(prompt) for prompt in prompts]
+        generations = [[Generation(text=text)] for text in texts]
         return LLMResult(generations=generations)
 
     def _call(
@@ -91,13 +116,18 @@ class DeepSeekLLM(LLM):
         
         # 调试模式输出消息内容
         if self.debug:
-            logging.info(f"DeepSeek API Messages: {messages}")
-            
-        client_params = {"api_key": self.api_key}
-        if self.base_url:
-            client_params["base_url"] = self.base_url
+            logger.info("DeepSeek API Messages: %s", messages)
+
+        # temperature为0时结果确定，优先命中缓存
+        cache_key = None
+        if self.temperature <= 0:
+            cache_key = response_cache_key(self.model, messages, None, self.temperature, stop,
+                                           base_url=self.base_url)
+            cached = get_cached_response(cache_key)
+            if cached is not None:
+                return cached
             
-        client = OpenAI(**client_params)
+        client = _get_client(self.api_key, self.base_url, self.timeout)
         
         retries = 0
         result = None
@@ -109,80 +139,53 @@ class DeepSeekLLM(LLM):
                     messages=messages,
                     temperature=self.temperature,
                     stop=stop,
-                    timeout=self.timeout
+                    timeout=self.timeout,
+                    stream=True
                 )
-                response_content = response.choices[0].message.content
+                # 分片收集到列表后一次性拼接，避免字符串反复+=拼接
+                chunks = []
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        chunks.append(chunk.choices[0].delta.content)
+                response_content = "".join(chunks)
                 
                 # 添加大模型返回数据的日志记录
-                logging.info(f"DeepSeek API Response: {response_content}")
+                logger.info("DeepSeek API Response: %s", response_content)
+
+                if cache_key is not None:
+                    set_cached_response(cache_key, response_content)
                 
                 return response_content
             except Exception as e:
                 retries += 1
+                if not is_retriable(e, (APIConnectionError,)):
+                    # 参数错误、鉴权失败等4xx错误重试无意义，直接返回
+                    logger.error("API调用失败: %s", e)
+                    return f"API请求失败: {str(e)}"
                 if retries == self.max_retries:
-                    logging.error(f"API调用失败: {str(e)}")
+                    logger.error("API调用失败: %s", e)
                     return f"API请求在达到最大重试次数后失败: {str(e)}"
-                else:
-                    logging.debug(f"重试API请求... (第{retries}次)")
+                logger.debug("重试API请求... (第%s次)", retries)
+                backoff_sleep(retries)
         
         return "API请求失败"
 
     def pack(self, prompt):
-        messages = []
         if isinstance(prompt, list) and all(isinstance(m, (SystemMessage, HumanMessage)) for m in prompt):
             # 处理消息列表
-            for me in prompt:
-                if isinstance(me, SystemMessage):
-                    data = {"role": "system", "content": me.content}
-                elif isinstance(me, HumanMessage):
-                    data = {"role": "user", "content": me.content}
-                # ... 其他类型
-                messages.append(data)
+            mes = prompt
         elif hasattr(prompt, "to_messages"):
             # 处理 PromptValue 对象
             mes = prompt.to_messages()
-            for me in mes:
-                if me.type == "system":
-                    data = {
-                        "role": "system",
-                        "content": me.content
-                    }
-                elif me.type == "ai":
-                    data = {
-                        "role": "assistant",
-                        "content": me.content
-                    }
-                elif me.type == "function":
-                    # 关键修改：将function角色转换为tool角色
-                    # data = {
-                    #     "role": "tool",
-                    #     "content": me.content
-                    # }
-                    data = {
-                        "role": "user",
-                        "content": f"工具结果: {me.content}"
-                    }
-                elif me.type == "human":
-                    data = {
-                        "role": "user",
-                        "content": me.content
-                    }
-                else:
-                    # 处理其他类型的消息，如ChatMessage
-                    role = me.type
-                    # 如果角色是'function'，转换为'tool'
-                    if role == "function":
-                        role = "tool"
-                    data = {
-                        "role": role,
-                        "content": me.content
-                    }
-                messages.append(data)
         else:
             # 处理字符串或其他类型
-            data = {"role": "user", "content": str(prompt)}
-            messages.append(data)
-        return messages
+            return [{"role": "user", "content": str(prompt)}]
+        # function消息转换为带前缀的user消息，其他未知类型（如ChatMessage）沿用原始类型作为角色
+        return [
+            {"role": _ROLE_MAP.get(me.type, me.type),
+             "content": _TOOL_RESULT_PREFIX + str(me.content) if me.type == "function" else me.content}
+            for me in mes
+        ]
 
     def debug_prompt(self, debug: bool):
         """设置调试模式。"""
@@ -4,14 +4,36 @@
 @Desc    : LLMCompiler
 @Time    : 2024-08-02 09:30:49
 """
-import inspect
 import logging
-from typing import Any, List, Optional, Tuple, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Mapping
 
+import openai
 from langchain.callbacks.manager import CallbackManagerForLLMRun, Callbacks
 from langchain.llms.base import LLM
 from langchain.schema import LLMResult, Generation, PromptValue
 
+from llmcompiler.custom_llms.retry import is_retriable, backoff_sleep
+from llmcompiler.custom_llms.response_cache import response_cache_key, get_cached_response, set_cached_response
+from llmcompiler.utils.thread.pool_executor import max_worker
+
+logger = logging.getLogger(__name__)
+
+# LangChain消息类型到OpenAI消息角色的映射
+_ROLE_MAP = {"system": "system", "ai": "assistant"}
+
+# 复用同一客户端的连接池，避免每次调用重新建立TCP/TLS连接
+_client_cache: Dict[tuple, openai.OpenAI] = {}
+
+
+def _get_client(timeout: float) -> openai.OpenAI:
+    key = (timeout,)
+    client = _client_cache.get(key)
+    if client is None:
+        # 重试由调用方控制，关闭SDK内置重试
+        client = _client_cache.setdefault(key, openai.OpenAI(timeout=timeout, max_retries=0))
+    return client
+
 
 class OpenaiLLM(LLM):
     temperature: float = 0.0
@@ -55,17 +77,16 @@ class OpenaiLLM(LLM):
             **kwargs: Any,
     ) -> LLMResult:
         """Run the LLM on the given prompt and input."""
-        # TODO: add caching here.
-        generations = []
-        new_arg_supported = inspect.signature(self._call).parameters.get("run_manager")
-
-        for prompt in prompts:
-            text = (
-                self._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
-                if new_arg_supported
-                else self._call(prompt, stop=stop, **kwargs)
-            )
-            generations.append([Generation(text=text)])
+        def call(prompt) -> str:
+            return self._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
+
+        if len(prompts) > 1:
+            # 各提示词相互独立，并发调用使总耗时接近单次调用耗时
+            with ThreadPoolExecutor(max_workers=max_worker(len(prompts))) as executor:
+                texts = list(executor.map(call, prompts))
+        else:
+            texts = [call(prompt) for prompt in prompts]
+        generations = [[Generation(text=text)] for text in texts]
         return LLMResult(generations=generations)
 
     def _call(
@@ -90,13 +111,19 @@ class OpenaiLLM(LLM):
         
         # 调试模式输出请求消息
         if self.debug:
-            logging.info(f"OpenAI API Messages: {messages}")
+            logger.info("OpenAI API Messages: %s", messages)
+
+        # temperature为0时结果确定，优先命中缓存
+        cache_key = None
+        if self.temperature <= 0:
+            cache_key = response_cache_key(self.model, messages, None, self.temperature)
+            cached = get_cached_response(cache_key)
+            if cached is not None:
+                return cached
         
         retries = 0
         
-        # 从此处开始添加OpenAI API的实际调用
-        import openai
-        client = openai.OpenAI()
+        client = _get_client(self.timeout)
         
         while retries < self.max_retries:
             try:
@@ -104,53 +131,42 @@ class OpenaiLLM(LLM):
                     model=self.model,
                     messages=messages,
                     temperature=self.temperature,
-                    timeout=self.timeout
+                    timeout=self.timeout,
+                    stream=True
                 )
-                response_content = response.choices[0].message.content
+                # 分片收集到列表后一次性拼接，避免字符串反复+=拼接
+                chunks = []
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        chunks.append(chunk.choices[0].delta.content)
+                response_content = "".join(chunks)
                 
                 # 添加大模型返回数据的日志记录
-                logging.info(f"OpenAI API Response: {response_content}")
+                logger.info("OpenAI API Response: %s", response_content)
+
+                if cache_key is not None:
+                    set_cached_response(cache_key, response_content)
                 
                 return response_content
             except Exception as e:
                 retries += 1
+                if not is_retriable(e, (openai.APIConnectionError,)):
+                    # 参数错误、鉴权失败等4xx错误重试无意义，直接返回
+                    logger.error("OpenAI API调用失败: %s", e)
+                    return f"API请求失败: {str(e)}"
                 if retries == self.max_retries:
-                    logging.error(f"OpenAI API调用失败: {str(e)}")
+                    logger.error("OpenAI API调用失败: %s", e)
                     return f"API请求在达到最大重试次数后失败: {str(e)}"
-                else:
-                    logging.debug(f"重试OpenAI API请求... (第{retries}次)")
+                logger.debug("重试OpenAI API请求... (第%s次)", retries)
+                backoff_sleep(retries)
         
         return "OpenAI API请求失败"
 
     def pack(self, prompt: PromptValue) -> List:
-        messages = []
-        if type(prompt) != str:
-            mes = prompt.to_messages()
-            for me in mes:
-                if me.type == "system":
-                    data = {
-                        "role": "system",
-                        "content": me.content
-                    }
-                elif me.type == "ai":
-                    data = {
-                        "role": "assistant",
-                        "content": me.content
-                    }
-                else:
-                    data = {
-                        "role": "user",
-                        "content": me.content
-                    }
-
-                messages.append(data)
-        else:
-            data = {
-                "role": "user",
-                "content": prompt
-            }
-            messages.append(data)
-        return messages
+        if type(prompt) == str:
+            return [{"role": "user", "content": prompt}]
+        # 除system与ai外的消息类型均作为用户消息
+        return [{"role": _ROLE_MAP.get(me.type, "user"), "content": me.content} for me in prompt.to_messages()]
 
     def debug_prompt(self, debug: bool):
         self.debug = debug
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : Yc-Ma
+@Desc    : LLM响应缓存：temperature为0时相同请求直接复用上一次的返回结果
+@Time    : 2024-08-02 09:30:49
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj: Any) -> bytes:
+    """
+    按键排序序列化，优先使用C实现的orjson
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False).encode()
+
+logger = logging.getLogger(__name__)
+
+# 缓存最大条目数，超出后按LRU淘汰
+MAX_CACHE_SIZE = 1024
+
+# 与AKShare数据缓存使用同一个根目录，不随运行时的工作目录变化
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".llmcompiler", "llm_cache.db")
+
+_llm_response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+_disk_conn: Optional[sqlite3.Connection] = None
+_disk_failed = False
+_disk_lock = threading.Lock()
+
+
+def cache_mode() -> str:
+    """
+    缓存模式，通过环境变量LLM_CACHE配置，每次读取以便load_dotenv在导入之后执行也能生效：
+        memory（默认）- 仅进程内缓存
+        exact         - 另外按缓存键持久化到SQLite（路径LLM_CACHE_PATH），重复运行同一批提示词时不再请求API
+        off           - 关闭缓存
+    """
+    return os.getenv("LLM_CACHE", "memory").lower()
+
+
+def _disk() -> Optional[sqlite3.Connection]:
+    """
+    exact模式下返回SQLite连接，首次使用时创建数据库，打开失败时退回仅进程内缓存
+    """
+    global _disk_conn, _disk_failed
+    if cache_mode() != "exact":
+        return None
+    if _disk_conn is None and not _disk_failed:
+        path = os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (key BLOB PRIMARY KEY, response TEXT NOT NULL)")
+            _disk_conn = conn
+        except sqlite3.Error as e:
+            logger.warning("打开LLM缓存数据库 %s 失败，仅使用进程内缓存: %s", path, e)
+            _disk_failed = True
+    return _disk_conn
+
+
+def response_cache_key(model: str, messages: List[Any], system: Optional[str] = None,
+                       temperature: float = 0.0, stop: Optional[List[str]] = None, **params: Any) -> bytes:
+    """
+    根据模型、消息、系统提示、温度与停止词生成缓存键，params为其它会影响响应内容的请求参数，
+    如max_tokens（截断长度不同的响应不能互相复用）、base_url（不同服务端的同名模型不能共用缓存）
+    """
+    payload = {"model": model, "messages": messages, "system": system, "temperature": temperature, "stop": stop,
+               **params}
+    return hashlib.blake2b(_dumps(payload), digest_size=16).digest()
+
+
+def get_cached_response(key: bytes) -> Optional[str]:
+    """
+    命中缓存时返回响应内容，否则返回None
+    """
+    if cache_mode() == "off":
+        return None
+    with _cache_lock:
+        value = _llm_response_cache.get(key)
+        if value is not None:
+            _llm_response_cache.move_to_end(key)
+            return value
+
+    with _disk_lock:
+        conn = _disk()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    _remember(key, row[0])
+    return row[0]
+
+
+def set_cached_response(key: bytes, value: str):
+    """
+    写入缓存，超出容量时淘汰最久未使用的条目
+    """
+    if cache_mode() == "off":
+        return
+    _remember(key, value)
+    with _disk_lock:
+        conn = _disk()
+        if conn is not None:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO llm_cache (key, response) VALUES (?, ?)", (key, value))
+
+
+def _remember(key: bytes, value: str):
+    with _cache_lock:
+        _llm_response_cache[key] = value
+        _llm_response_cache.move_to_end(key)
+        while len(_llm_response_cache) > MAX_CACHE_SIZE:
+            _llm_response_cache.popitem(last=False)
+
+
+def clear_response_cache():
+    """
+    清空响应缓存，包括持久化到SQLite的条目
+    """
+    with _cache_lock:
+        _llm_response_cache.clear()
+    with _disk_lock:
+        conn = _disk()
+        if conn is not None:
+            with conn:
+                conn.execute("DELETE FROM llm_cache")
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : Yc-Ma
+@Desc    : LLM接口重试策略：仅对限流、服务端错误与连接错误做指数退避重试
+@Time    : 2024-08-02 09:30:49
+"""
+import random
+import time
+from typing import Tuple, Type
+
+# 可重试的HTTP状态码，其余4xx错误重试也不会成功
+RETRIABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+# 单次退避的最大等待秒数
+MAX_BACKOFF_SECONDS = 30
+
+
+def is_retriable(e: Exception, connection_errors: Tuple[Type[Exception], ...] = ()) -> bool:
+    """
+    判断异常是否值得重试：连接错误/超时，或状态码属于RETRIABLE_STATUS_CODES
+    """
+    if connection_errors and isinstance(e, connection_errors):
+        return True
+    return getattr(e, "status_code", None) in RETRIABLE_STATUS_CODES
+
+
+def backoff_sleep(retries: int):
+    """
+    指数退避并叠加随机抖动，避免多个请求同时重试
+    """
+    time.sleep(min(MAX_BACKOFF_SECONDS, 2 ** retries) + random.random())
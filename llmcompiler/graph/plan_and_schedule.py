@@ -36,6 +36,11 @@ from llmcompiler.tools.generic.action_output import ActionOutput, ActionOutputEr
 from llmcompiler.utils.string.string_sim import word_similarity_score
 from llmcompiler.graph.token_calculate import SwitchLLM
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def _get_observations(messages: List[BaseMessage]) -> Dict[int, Any]:
     # Get all previous tool responses
@@ -655,12 +660,35 @@ def modify_action_output(action_output: Union[ActionOutput, ActionOutputError, A
             elif isinstance(action_output.any, List):
                 if any(isinstance(x, Chart) for x in action_output.any):
                     temp_charts = reset_prompt_charts(action_output.any)
-                    any_str = json.dumps([c.dict() for c in temp_charts], ensure_ascii=False)
+                    any_str = _dumps_charts([c.dict() for c in temp_charts])
                     return "\n".join([action_output.msg, any_str, "\n" + extra_msg])
 
     return action_output
 
 
+def _dumps_charts(charts: List[Dict[str, Any]]) -> str:
+    """
+    序列化图表数据，优先使用orjson：直接编码numpy数组与时间类型，避免标准库逐个元素回调；
+    `df.to_dict()`产生的整数等非字符串键通过OPT_NON_STR_KEYS转为字符串，orjson不支持的键（如Timestamp）退回标准库
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(charts, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+                                | orjson.OPT_NON_STR_KEYS, default=str).decode()
+        except TypeError:
+            pass
+    return json.dumps(_str_keys(charts), ensure_ascii=False, default=str)
+
+
+def _str_keys(obj: Any) -> Any:
+    """递归地将字典中的非字符串键转为字符串，标准库json只接受str/int/float/bool/None键"""
+    if isinstance(obj, dict):
+        return {k if isinstance(k, str) else str(k): _str_keys(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_str_keys(v) for v in obj]
+    return obj
+
+
 def reset_prompt_chart(chart: Chart) -> BaseChart:
     """去掉不需要传入到Prompt中的字段"""
     return BaseChart(title=chart.title, data=chart.data)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : AKShare数据文件缓存 - 按方法名与参数缓存AKShare返回的DataFrame，并按接口设置过期时间
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from llmcompiler.tools.basetool._akshare_rate_limit import bucket_for, rate_limited
+from llmcompiler.tools.basetool._akshare_usage import record_usage
+
+logger = logging.getLogger(__name__)
+
+# 缓存过期时间（秒）：盘中/当日数据1分钟，基金净值1小时，历史数据1天，宏观年度数据7天
+TTL_INTRADAY = 60
+TTL_FUND_NAV = 60 * 60
+TTL_HISTORICAL = 24 * 60 * 60
+TTL_MACRO = 7 * 24 * 60 * 60
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".llmcompiler", "akshare_cache")
+
+
+class FileCache:
+    """
+    AKShare数据文件缓存：数据写入`{cache_dir}/{method_name}/{key}.feather`，
+    同目录下的`{key}.meta.json`记录写入时间、过期时间与存储格式
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def make_key(method_name: str, params: Dict[str, Any]) -> str:
+        """根据方法名与参数生成缓存键"""
+        data = json.dumps({"m": method_name, "p": params}, sort_keys=True, default=str)
+        return hashlib.md5(data.encode()).hexdigest()
+
+    def _base_path(self, method_name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, method_name, key)
+
+    def get(self, method_name: str, key: str) -> Optional[pd.DataFrame]:
+        """读取未过期的缓存数据，不存在、已过期或读取失败时返回None"""
+        base = self._base_path(method_name, key)
+        try:
+            with open(f"{base}.meta.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            if time.time() - meta["ts"] > meta["ttl"]:
+                return None
+            if meta["format"] == "feather":
+                return pd.read_feather(f"{base}.feather")
+            if meta["format"] == "parquet":
+                return pd.read_parquet(f"{base}.parquet")
+            return pd.read_pickle(f"{base}.pkl")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取AKShare缓存 {method_name}/{key} 出错: {str(e)}")
+            return None
+
+    def set(self, method_name: str, key: str, df: pd.DataFrame, ttl: int):
+        """
+        写入缓存数据，优先使用Feather：Arrow内存布局直接落盘，读取几乎无需解码，比Parquet更快；
+        缺少pyarrow或数据类型不受支持（如同一列混有数字与字符串）时退回pickle
+        """
+        base = self._base_path(method_name, key)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        try:
+            df.to_feather(f"{base}.feather")
+            data_format = "feather"
+        except Exception:
+            # 转换失败时可能已留下不完整的feather文件
+            if os.path.exists(f"{base}.feather"):
+                os.remove(f"{base}.feather")
+            df.to_pickle(f"{base}.pkl")
+            data_format = "pickle"
+        # 先写临时文件再替换，避免并发读取到不完整的元数据
+        tmp_path = f"{base}.meta.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ts": time.time(), "ttl": ttl, "format": data_format}, f)
+        os.replace(tmp_path, f"{base}.meta.json")
+
+    def get_or_compute(self, method_name: str, params: Dict[str, Any], ttl: int,
+                       compute: Callable[[], Any]) -> Any:
+        """命中缓存直接返回，否则调用compute获取数据，非空DataFrame结果写入缓存"""
+        key = self.make_key(method_name, params)
+        df = self.get(method_name, key)
+        if df is not None:
+            return df
+        result = compute()
+        if isinstance(result, pd.DataFrame) and not result.empty:
+            try:
+                self.set(method_name, key, result, ttl)
+            except Exception as e:
+                logger.warning(f"写入AKShare缓存 {method_name}/{key} 出错: {str(e)}")
+        return result
+
+
+akshare_cache = FileCache()
+
+
+def cached_call(method_name: str, params: Dict[str, Any], ttl: int, func: Callable[..., Any],
+                use_cache: bool = True) -> Any:
+    """
+    通过文件缓存调用AKShare方法，未命中缓存时按数据源限流并对连接错误重试
+
+    Args:
+        method_name: AKShare方法名，用作缓存目录
+        params: 传递给AKShare方法的参数
+        ttl: 缓存过期时间（秒）
+        func: AKShare方法
+        use_cache: 为False时跳过缓存直接调用
+    """
+    record_usage(method_name)
+    fetch = rate_limited(bucket_for(method_name))(func)
+    if not use_cache:
+        return fetch(**params)
+    return akshare_cache.get_or_compute(method_name, params, ttl, lambda: fetch(**params))
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : AKShare请求限流与重试 - 东方财富、新浪等数据源对访问频率有限制，超出后会断开连接甚至封禁IP，
+           这里按上游数据源共享令牌桶限流，并对连接错误做指数退避重试
+"""
+import functools
+import http.client
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+import requests
+
+from llmcompiler.custom_llms.retry import backoff_sleep
+
+logger = logging.getLogger(__name__)
+
+# 每秒补充的令牌数与桶容量
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+MAX_RETRIES = 3
+
+# 连接被拒绝、被重置或远端直接断开时通常是触发了频率限制，稍后重试即可
+CONNECTION_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                     http.client.RemoteDisconnected, ConnectionError)
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶：以rate的速度补充令牌，最多累积burst个，取不到令牌时阻塞等待
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# 按上游数据源共享的令牌桶
+_BUCKETS: Dict[str, TokenBucket] = {
+    "eastmoney": TokenBucket(),
+    "sina": TokenBucket(),
+    "default": TokenBucket(),
+}
+
+# AKShare方法名中标识数据源的片段，按顺序匹配
+_HOST_MARKERS = (("sina", "sina"), ("_em", "eastmoney"), ("stock_zh_a_hist", "eastmoney"))
+
+
+def bucket_for(method_name: str) -> str:
+    """根据AKShare方法名判断其上游数据源，无法判断时归入default"""
+    for marker, bucket in _HOST_MARKERS:
+        if marker in method_name:
+            return bucket
+    return "default"
+
+
+def rate_limited(bucket: str = "default") -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    装饰器：调用前从指定数据源的令牌桶取令牌，遇到连接错误时最多重试MAX_RETRIES次
+
+    Args:
+        bucket: 令牌桶名称，未知名称使用default
+    """
+    token_bucket = _BUCKETS.get(bucket, _BUCKETS["default"])
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            retries = 0
+            while True:
+                token_bucket.acquire()
+                try:
+                    return func(*args, **kwargs)
+                except CONNECTION_ERRORS as e:
+                    if retries >= MAX_RETRIES:
+                        raise
+                    logger.warning("AKShare请求 %s 连接失败，第 %s 次重试: %s",
+                                   getattr(func, "__name__", func), retries + 1, e)
+                    backoff_sleep(retries)
+                    retries += 1
+
+        return wrapper
+
+    return decorator
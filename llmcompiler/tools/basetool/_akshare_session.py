@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : AKShare HTTP连接复用 - AKShare内部直接调用`requests.get/post`，每次请求都要重新建立TCP/TLS连接，
+           这里把已加载的AKShare子模块中的`requests`替换为绑定共享Session的代理，复用连接池
+"""
+import functools
+import logging
+import sys
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# 缓存连接池的主机数与单个主机的最大连接数，后者需覆盖批量并发调用的线程数
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 64
+# AKShare请求未指定请求头时使用的默认User-Agent，部分数据源会拒绝`python-requests`
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": DEFAULT_USER_AGENT, "Connection": "keep-alive"})
+# 连接错误的重试由_akshare_rate_limit统一负责（带退避并计入限流），连接池本身不再重试，避免重试次数叠加
+_adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+_install_lock = threading.Lock()
+
+
+class _PooledRequests:
+    """
+    `requests`模块的代理：请求方法走共享Session，其它属性（异常类型、工具函数等）转发给原模块
+    """
+
+    def __init__(self, session: requests.Session):
+        self._session = session
+
+    def request(self, method, url, **kwargs):
+        return self._session.request(method, url, **kwargs)
+
+    def get(self, url, params=None, **kwargs):
+        return self._session.get(url, params=params, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return self._session.post(url, data=data, json=json, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+_pooled_requests = _PooledRequests(_SESSION)
+
+
+def install_shared_session() -> int:
+    """
+    将已导入的AKShare子模块中的`requests`替换为共享Session代理，可重复调用
+
+    Returns:
+        本次替换的模块数量
+    """
+    patched = 0
+    with _install_lock:
+        for name, module in list(sys.modules.items()):
+            if (name == "akshare" or name.startswith("akshare.")) and getattr(module, "requests", None) is requests:
+                module.requests = _pooled_requests
+                patched += 1
+    if patched:
+        logger.debug("AKShare共享HTTP连接池已应用到 %s 个模块", patched)
+    return patched
+
+
+@functools.lru_cache(maxsize=1)
+def load_akshare():
+    """
+    首次调用时才导入AKShare并应用共享连接池：AKShare顶层导入会加载pandas、lxml、bs4等大量依赖，
+    仅引用工具而不执行时无需承担这部分开销
+    """
+    try:
+        import akshare as ak
+    except ImportError:
+        raise ImportError(
+            "The 'akshare' package is required to use this class. Please install it using 'pip install akshare'.")
+    install_shared_session()
+    return ak
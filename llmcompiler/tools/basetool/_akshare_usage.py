@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : AKShare方法调用记录 - 每次调用追加一行到JSON Lines日志，常用工具按近期实际调用次数排序
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# 与AKShare数据文件缓存使用同一个根目录
+DEFAULT_USAGE_PATH = os.path.join(os.path.expanduser("~"), ".llmcompiler", "akshare_usage.jsonl")
+# 只统计最近30天的调用，使排序跟随近期的使用情况
+USAGE_WINDOW = 30 * 24 * 60 * 60
+# 日志超过该大小时压缩：丢弃统计窗口之外的记录，并只保留最近的MAX_USAGE_RECORDS条
+MAX_USAGE_BYTES = 1024 * 1024
+MAX_USAGE_RECORDS = 10000
+
+_usage_lock = threading.Lock()
+
+
+def usage_path() -> str:
+    """调用记录路径，通过环境变量AKSHARE_USAGE_PATH配置"""
+    return os.getenv("AKSHARE_USAGE_PATH", DEFAULT_USAGE_PATH)
+
+
+def record_usage(method_name: str):
+    """记录一次AKShare方法调用，写入失败只记录日志，不影响工具执行"""
+    path = usage_path()
+    line = json.dumps({"tool": method_name, "ts": time.time()}) + "\n"
+    try:
+        with _usage_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+            if os.path.getsize(path) > MAX_USAGE_BYTES:
+                _compact(path)
+    except OSError as e:
+        logger.debug("写入AKShare调用记录 %s 失败: %s", path, e)
+
+
+def _read_records(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 跳过并发写入或异常退出留下的不完整行
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+    return records
+
+
+def _compact(path: str):
+    """只保留统计窗口内最近的MAX_USAGE_RECORDS条记录，先写临时文件再替换"""
+    since = time.time() - USAGE_WINDOW
+    records = [r for r in _read_records(path) if r.get("ts", 0) >= since][-MAX_USAGE_RECORDS:]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in records)
+    os.replace(tmp_path, path)
+
+
+def ranked_methods(window: int = USAGE_WINDOW) -> List[str]:
+    """
+    按最近window秒内的调用次数从高到低返回方法名，没有调用记录时返回空列表
+    """
+    since = time.time() - window
+    try:
+        records = _read_records(usage_path())
+    except FileNotFoundError:
+        return []
+    except OSError as e:
+        logger.warning("读取AKShare调用记录失败: %s", e)
+        return []
+    counts = Counter(r.get("tool") for r in records if r.get("ts", 0) >= since)
+    return [method for method, _ in counts.most_common() if method]
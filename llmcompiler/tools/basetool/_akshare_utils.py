@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : AKShare工具公共方法 - DataFrame结果转换为图表数据
+"""
+import base64
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from llmcompiler.tools.generic.action_output import ActionOutput, Chart, ChartType
+
+# AKShare工具图表共用的常量字段
+AKSHARE_URL = "https://akshare.akfamily.xyz/"
+TABLE_TYPE = ChartType.TABLE_WITH_HEADERS.value
+# arrow序列化时表格数据所在的键
+ARROW_DATA_KEY = "arrow_ipc_b64"
+# 表格超过该行数时，下一步Prompt中只放入摘要而不是完整数据
+PROMPT_MAX_ROWS = 20
+
+
+def df_table_data(df: pd.DataFrame, serialization: str = "list") -> Dict[str, Any]:
+    """
+    将DataFrame转换为表格图表数据：labels为列名，data为逐行数据
+    
+    使用`to_dict(orient="split")`按列取值，避免`df.values`先物化一份object类型的二维数组再转list；
+    serialization为"arrow"时改为返回Arrow IPC字节流的base64编码，数值保持原生类型，
+    前端可通过`pyarrow.ipc.deserialize_pandas`还原
+    """
+    if serialization == "arrow":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(
+                "The 'pyarrow' package is required for arrow serialization. Please install it using 'pip install pyarrow'.")
+        buf = pa.ipc.serialize_pandas(shrink_dtypes(df), preserve_index=False).to_pybytes()
+        return {"labels": df.columns.tolist(), ARROW_DATA_KEY: base64.b64encode(buf).decode()}
+    split = df.to_dict(orient="split", index=False)
+    return {"labels": split["columns"], "data": split["data"]}
+
+
+def shrink_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将int64/float64列转换为能无损容纳数据的更窄类型，返回新的DataFrame，不修改原数据
+    
+    float64仅在所有值都能被float32精确表示时才转换，避免价格等小数出现精度误差
+    """
+    if not df.columns.is_unique:
+        return df
+    shrunk = {}
+    for c in df.select_dtypes(include=["int64", "float64"]).columns:
+        col = df[c]
+        if col.dtype.kind == "i":
+            shrunk[c] = pd.to_numeric(col, downcast="integer")
+        else:
+            narrowed = col.astype(np.float32)
+            if np.array_equal(narrowed.to_numpy(dtype=np.float64), col.to_numpy(), equal_nan=True):
+                shrunk[c] = narrowed
+    if not shrunk:
+        return df
+    df = df.copy(deep=False)
+    for c, col in shrunk.items():
+        df[c] = col
+    return df
+
+
+def select_columns(df: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+    """
+    按调用方指定的列名裁剪DataFrame，忽略不存在的列；未指定或均不存在时原样返回
+    """
+    if not columns:
+        return df
+    keep = [c for c in columns if c in df.columns]
+    return df.loc[:, keep] if keep else df
+
+
+def unwrap_dataframe(result: Any) -> Optional[pd.DataFrame]:
+    """
+    AKShare方法绝大多数直接返回DataFrame，少数返回DataFrame列表时取第一个，其它返回值返回None
+    """
+    if isinstance(result, pd.DataFrame):
+        return result
+    if isinstance(result, (list, tuple)) and result and isinstance(result[0], pd.DataFrame):
+        return result[0]
+    return None
+
+
+def summarise_df(df: pd.DataFrame, max_rows: int = PROMPT_MAX_ROWS) -> str:
+    """
+    将DataFrame转换为给LLM阅读的紧凑文本：超过max_rows行时保留首尾各一半，并注明截断的行数
+    
+    行情等数据按时间升序排列，最新的数据在末尾，因此不能只保留开头
+    """
+    n = len(df)
+    if n > max_rows:
+        half = max_rows // 2
+        shown = pd.concat([df.head(half), df.tail(max_rows - half)])
+    else:
+        shown = df
+    try:
+        text = shown.to_markdown(index=False)
+    except ImportError:
+        # to_markdown依赖tabulate，未安装时使用同样紧凑的CSV
+        text = shown.to_csv(index=False)
+    if n > max_rows:
+        text += f"\n（数据已截断：共{n}行，仅展示首尾{max_rows}行）"
+    return text
+
+
+def table_action_output(charts: List[Chart], dfs: Sequence[pd.DataFrame],
+                        max_rows: int = PROMPT_MAX_ROWS) -> ActionOutput:
+    """
+    构造表格工具的ActionOutput：表格都不超过max_rows行且为逐行列表时完整数据进入下一步Prompt；
+    否则Prompt中只放入`summarise_df`摘要，完整数据仍保留在图表中供前端展示。
+    arrow序列化的数据是LLM无法阅读的base64字节流，无论行数多少都只放入摘要
+    """
+    binary = any(ARROW_DATA_KEY in chart.data for chart in charts)
+    if not binary and all(len(df) <= max_rows for df in dfs):
+        return ActionOutput(any=charts)
+    msg = "\n\n".join(f"{chart.title}\n{summarise_df(df, max_rows)}" for chart, df in zip(charts, dfs))
+    return ActionOutput(any=charts, any_to_prompt=False, msg=msg)
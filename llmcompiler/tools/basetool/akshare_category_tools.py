@@ -3,9 +3,13 @@
 @Desc    : AKShare分类工具 - 按分类组织AKShare方法
 """
 import re
+import asyncio
 import inspect
 import logging
-from typing import List, Dict, Optional, Set, Any, Type
+import functools
+from collections import defaultdict
+from types import MappingProxyType
+from typing import List, Dict, Optional, Set, Any, Type, Mapping, Tuple
 
 from langchain_core.tools import BaseTool
 from pydantic import Field, BaseModel
@@ -19,12 +23,6 @@ from llmcompiler.tools.basetool.akshare_dynamic_tool import (
 
 logger = logging.getLogger(__name__)
 
-try:
-    import akshare as ak
-except ImportError:
-    raise ImportError(
-        "The 'akshare' package is required to use this class. Please install it using 'pip install akshare'.")
-
 
 # 方法名前缀与分类的映射
 METHOD_PREFIX_CATEGORIES = {
@@ -42,7 +40,30 @@ METHOD_PREFIX_CATEGORIES = {
     "crypto_": "crypto",
 }
 
+_PREFIX_TUPLE = tuple(METHOD_PREFIX_CATEGORIES)
+
+# 方法名中的关键词与分类的映射，按顺序匹配
+METHOD_KEYWORD_CATEGORIES = {
+    "stock": ["stock", "shares", "equity", "a_share", "hk_", "us_", "zh_a"],
+    "fund": ["fund", "etf"],
+    "bond": ["bond", "repo", "shibor"],
+    "option": ["option"],
+    "future": ["future", "futures", "cffex", "shfe", "czce", "dce"],
+    "fx": ["fx", "currency", "cny", "exchange"],
+    "macro": ["macro", "gdp", "cpi", "ppi", "pmi"],
+    "index": ["index", "indices", "sz_", "sh_", "zz_"],
+    "crypto": ["crypto", "bitcoin", "blockchain"],
+}
+
+# 将关键词扫描预编译为一个正则：每个分类一个分支，分支内用前瞻在整个方法名中查找关键词，
+# 分支按分类顺序尝试，命中分支末尾的空命名组即为分类名（与逐个分类、逐个关键词匹配的结果一致）
+_KEYWORD_RE = re.compile("|".join(
+    f"(?=.*?(?:{'|'.join(map(re.escape, words))}))(?P<{category}>)"
+    for category, words in METHOD_KEYWORD_CATEGORIES.items()
+))
+
 
+@functools.lru_cache(maxsize=None)
 def categorize_akshare_method(method_name: str) -> str:
     """
     根据方法名对AKShare方法进行分类
@@ -53,50 +74,83 @@ def categorize_akshare_method(method_name: str) -> str:
     Returns:
         分类名称
     """
-    for prefix, category in METHOD_PREFIX_CATEGORIES.items():
-        if method_name.startswith(prefix):
-            return category
+    # str.startswith接受元组，在C层一次完成所有前缀比较；前缀均为"单词_"形式，命中后按首个下划线切分查表
+    if method_name.startswith(_PREFIX_TUPLE):
+        return METHOD_PREFIX_CATEGORIES[method_name[:method_name.index("_") + 1]]
     
     # 没有匹配前缀，进一步检查方法名中的关键词
-    keywords = {
-        "stock": ["stock", "shares", "equity", "a_share", "hk_", "us_", "zh_a"],
-        "fund": ["fund", "etf"],
-        "bond": ["bond", "repo", "shibor"],
-        "option": ["option"],
-        "future": ["future", "futures", "cffex", "shfe", "czce", "dce"],
-        "fx": ["fx", "currency", "cny", "exchange"],
-        "macro": ["macro", "gdp", "cpi", "ppi", "pmi"],
-        "index": ["index", "indices", "sz_", "sh_", "zz_"],
-        "crypto": ["crypto", "bitcoin", "blockchain"],
-    }
-    
-    for category, words in keywords.items():
-        for word in words:
-            if word in method_name:
-                return category
+    match = _KEYWORD_RE.match(method_name)
+    if match:
+        return match.lastgroup
     
     # 默认分类
     return "others"
 
 
-def get_akshare_methods_by_category() -> Dict[str, List[str]]:
+@functools.lru_cache(maxsize=1)
+def get_akshare_methods_by_category() -> Mapping[str, Tuple[str, ...]]:
     """
-    按类别获取AKShare所有方法
+    按类别获取AKShare所有方法，结果在进程内缓存
     
     Returns:
-        按类别组织的方法名字典
+        按类别组织的方法名只读字典
     """
     # 获取所有方法
     all_methods = AKShareDynamicTool.get_available_methods()
     
-    # 按类别组织
-    categorized_methods = {category: [] for category in AKSHARE_CATEGORIES.keys()}
+    # 按类别组织，defaultdict可容纳AKSHARE_CATEGORIES之外的分类
+    categorized_methods = defaultdict(list)
     
     for method_name in all_methods:
-        category = categorize_akshare_method(method_name)
-        categorized_methods[category].append(method_name)
+        categorized_methods[categorize_akshare_method(method_name)].append(method_name)
     
-    return categorized_methods
+    # 保证所有已知分类都存在；结果被缓存共享，返回只读视图防止调用方修改
+    result = dict.fromkeys(AKSHARE_CATEGORIES, ())
+    result.update((category, tuple(methods)) for category, methods in categorized_methods.items())
+    return MappingProxyType(result)
+
+
+# 常用的AKShare方法，按分类排列
+COMMON_AKSHARE_METHODS: Tuple[str, ...] = (
+    # 股票
+    "stock_zh_a_hist",  # A股历史数据
+    "stock_zh_a_spot",  # A股实时行情
+    "stock_individual_info_em",  # 个股信息
+    "stock_zh_a_daily",  # A股日线行情
+    "stock_zh_index_daily",  # A股指数日线行情
+    
+    # 基金
+    "fund_em_open_fund_info",  # 开放式基金信息
+    "fund_em_etf_fund_daily",  # ETF基金行情
+    "fund_em_fund_name",  # 基金名称
+    "fund_em_open_fund_daily",  # 开放式基金行情
+    
+    # 债券
+    "bond_zh_hs_cov_daily",  # 可转债行情
+    "bond_zh_hs_daily",  # 债券行情
+    "bond_china_yield",  # 中国债券收益率曲线
+    
+    # 宏观经济
+    "macro_china_cpi_yearly",  # 中国年度CPI
+    "macro_china_ppi_yearly",  # 中国年度PPI
+    "macro_china_gdp_yearly",  # 中国年度GDP
+    "macro_china_pmi_yearly",  # 中国年度PMI
+    
+    # 外汇
+    "fx_spot_quote",  # 外汇即期报价
+    "currency_latest",  # 货币最新行情
+    
+    # 期货
+    "futures_main_sina",  # 期货主力合约
+    "futures_daily",  # 期货日线行情
+    
+    # 指数
+    "index_zh_a_hist",  # A股指数历史行情
+    "index_global",  # 全球指数数据
+    
+    # 加密货币
+    "crypto_hist",  # 加密货币历史数据
+)
 
 
 def get_common_akshare_methods() -> List[str]:
@@ -106,51 +160,46 @@ def get_common_akshare_methods() -> List[str]:
     Returns:
         常用方法名列表
     """
-    return [
-        # 股票
-        "stock_zh_a_hist",  # A股历史数据
-        "stock_zh_a_spot",  # A股实时行情
-        "stock_individual_info_em",  # 个股信息
-        "stock_zh_a_daily",  # A股日线行情
-        "stock_zh_index_daily",  # A股指数日线行情
-        
-        # 基金
-        "fund_em_open_fund_info",  # 开放式基金信息
-        "fund_em_etf_fund_daily",  # ETF基金行情
-        "fund_em_fund_name",  # 基金名称
-        "fund_em_open_fund_daily",  # 开放式基金行情
-        
-        # 债券
-        "bond_zh_hs_cov_daily",  # 可转债行情
-        "bond_zh_hs_daily",  # 债券行情
-        "bond_china_yield",  # 中国债券收益率曲线
-        
-        # 宏观经济
-        "macro_china_cpi_yearly",  # 中国年度CPI
-        "macro_china_ppi_yearly",  # 中国年度PPI
-        "macro_china_gdp_yearly",  # 中国年度GDP
-        "macro_china_pmi_yearly",  # 中国年度PMI
-        
-        # 外汇
-        "fx_spot_quote",  # 外汇即期报价
-        "currency_latest",  # 货币最新行情
-        
-        # 期货
-        "futures_main_sina",  # 期货主力合约
-        "futures_daily",  # 期货日线行情
-        
-        # 指数
-        "index_zh_a_hist",  # A股指数历史行情
-        "index_global",  # 全球指数数据
+    return list(COMMON_AKSHARE_METHODS)
+
+
+@functools.lru_cache(maxsize=None)
+def get_category_payload(category_key: str) -> Dict[str, Any]:
+    """
+    获取分类下的方法信息，结果在进程内缓存
+    
+    Args:
+        category_key: 分类名称键
         
-        # 加密货币
-        "crypto_hist",  # 加密货币历史数据
-    ]
+    Returns:
+        包含分类方法信息的字典
+    """
+    methods = get_akshare_methods_by_category().get(category_key, ())
+    
+    result = {
+        "category": category_key,
+        "category_name": AKSHARE_CATEGORIES.get(category_key, "未知分类"),
+        "method_count": len(methods),
+        "methods": []
+    }
+    
+    for method_name in methods[:30]:  # 只返回前30个方法
+        try:
+            method_info = AKShareDynamicTool.get_method_info(method_name)
+            result["methods"].append({
+                "name": method_name,
+                "description": method_info.get("doc", "").partition("\n")[0],
+                "parameter_count": len(method_info.get("parameters", {}))
+            })
+        except Exception as e:
+            logger.error(f"获取方法 {method_name} 信息时出错: {str(e)}")
+    
+    return result
 
 
 class AKShareCategoryToolInput(BaseModel):
     """AKShare分类工具输入模型"""
-    category_key: str = Field(description="分类名称键")
+    category_key: str = Field(default="", description="分类名称键")
 
 
 class AKShareCategoryTool(BaseTool):
@@ -160,6 +209,8 @@ class AKShareCategoryTool(BaseTool):
     name: str = ""
     description: str = ""
     args_schema: Optional[Type[BaseModel]] = AKShareCategoryToolInput
+    category_key: str = ""
+    category_name: str = ""
     
     def __init__(self, category_key: str):
         """
@@ -171,49 +222,30 @@ class AKShareCategoryTool(BaseTool):
         # 获取分类信息
         category_name = AKSHARE_CATEGORIES.get(category_key, "未知分类")
         
-        # 设置工具属性
-        self.name = f"akshare_{category_key}_category"
-        self.description = f"获取AKShare {category_name}分类下的所有可用方法信息"
-        self._category_key = category_key
-        self.category_name = category_name
-        
-        # 初始化基类
-        super().__init__()
+        # 通过基类初始化设置工具属性
+        super().__init__(
+            name=f"akshare_{category_key}_category",
+            description=f"获取AKShare {category_name}分类下的所有可用方法信息",
+            category_key=category_key,
+            category_name=category_name,
+        )
     
     def _run(self, **kwargs):
         """
         运行分类工具，列出该分类下的所有方法
         """
         try:
-            categorized_methods = get_akshare_methods_by_category()
-            methods = categorized_methods.get(self._category_key, [])
-            
-            result = {
-                "category": self._category_key,
-                "category_name": self.category_name,
-                "method_count": len(methods),
-                "methods": []
-            }
-            
-            for method_name in methods[:30]:  # 只返回前30个方法
-                try:
-                    method_info = AKShareDynamicTool.get_method_info(method_name)
-                    result["methods"].append({
-                        "name": method_name,
-                        "description": method_info.get("doc", "").split("\n")[0],
-                        "parameter_count": len(method_info.get("parameters", {}))
-                    })
-                except Exception as e:
-                    logger.error(f"获取方法 {method_name} 信息时出错: {str(e)}")
-            
+            # 返回浅拷贝，避免调用方修改缓存中的结果
+            result = dict(get_category_payload(self.category_key))
+            result["methods"] = list(result["methods"])
             return result
         except Exception as e:
             logger.error(f"执行AKShare分类工具出错: {str(e)}")
             return {"error": str(e)}
 
     async def _arun(self, **kwargs):
-        """异步执行分类工具"""
-        return self._run(**kwargs)
+        """异步执行分类工具：首次执行需要反射AKShare方法，放到线程池执行以免阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._run, **kwargs))
 
 
 def get_akshare_category_tools() -> List[BaseTool]:
@@ -227,53 +259,7 @@ def get_akshare_category_tools() -> List[BaseTool]:
     
     for category_key in AKSHARE_CATEGORIES.keys():
         try:
-            category_name = AKSHARE_CATEGORIES.get(category_key, "未知分类")
-            
-            # 为每个分类定义一个专门的工具类
-            class AKShareCategoryToolForCategory(BaseTool):
-                name = f"akshare_{category_key}_category"
-                description = f"获取AKShare {category_name}分类下的所有可用方法信息"
-                
-                def _run(self, **kwargs) -> dict:
-                    """
-                    运行分类工具，列出该分类下的所有方法
-                    
-                    Returns:
-                        包含分类方法信息的字典
-                    """
-                    try:
-                        categorized_methods = get_akshare_methods_by_category()
-                        methods = categorized_methods.get(category_key, [])
-                        
-                        result = {
-                            "category": category_key,
-                            "category_name": category_name,
-                            "method_count": len(methods),
-                            "methods": []
-                        }
-                        
-                        for method_name in methods[:30]:  # 只返回前30个方法
-                            try:
-                                method_info = AKShareDynamicTool.get_method_info(method_name)
-                                result["methods"].append({
-                                    "name": method_name,
-                                    "description": method_info.get("doc", "").split("\n")[0],
-                                    "parameter_count": len(method_info.get("parameters", {}))
-                                })
-                            except Exception as e:
-                                logger.error(f"获取方法 {method_name} 信息时出错: {str(e)}")
-                        
-                        return result
-                    except Exception as e:
-                        logger.error(f"执行AKShare分类工具出错: {str(e)}")
-                        return {"error": str(e)}
-                
-                async def _arun(self, **kwargs):
-                    """异步执行分类工具"""
-                    return self._run(**kwargs)
-            
-            # 添加工具实例
-            tools.append(AKShareCategoryToolForCategory())
+            tools.append(AKShareCategoryTool(category_key))
         except Exception as e:
             logger.error(f"创建分类工具 {category_key} 时出错: {str(e)}")
     
@@ -2,28 +2,41 @@
 """
 @Desc    : AKShare Dynamic Tool - 支持动态调用AKShare的所有方法
 """
+import asyncio
 import inspect
 import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from langchain_core.tools import BaseTool
 from pydantic import Field, BaseModel, create_model
-from typing import Type, List, Dict, Any, Callable, Optional, Tuple, Union
+from typing import Type, List, Dict, Any, Callable, Optional, Tuple, Union, Literal
 import warnings
 from typing import cast, ClassVar
 
+from llmcompiler.tools.basetool._akshare_cache import cached_call, TTL_INTRADAY, TTL_MACRO
+from llmcompiler.tools.basetool._akshare_session import load_akshare
+from llmcompiler.tools.basetool._akshare_utils import df_table_data, select_columns, table_action_output, unwrap_dataframe, \
+    AKSHARE_URL, TABLE_TYPE
 from llmcompiler.tools.configure.tool_decorator import tool_kwargs_filter, tool_set_pydantic_default
-from llmcompiler.tools.generic.action_output import ChartType, Chart, \
-    action_output_charts_df_parse, Source
+from llmcompiler.tools.generic.action_output import Chart, action_output_charts_df_parse, Source
 from llmcompiler.tools.generic.action_output import ActionOutput, ActionOutputError
 from llmcompiler.tools.generic.render_description import render_text_description
 
 logger = logging.getLogger(__name__)
 
-try:
-    import akshare as ak
-except ImportError:
-    raise ImportError(
-        "The 'akshare' package is required to use this class. Please install it using 'pip install akshare'.")
+
+def method_ttl(method_name: str) -> int:
+    """AKShare方法结果的缓存过期时间：宏观数据更新频率低，其余按盘中数据处理"""
+    return TTL_MACRO if method_name.startswith("macro_") else TTL_INTRADAY
+
+
+@functools.lru_cache(maxsize=1)
+def ak_methods() -> Dict[str, Callable]:
+    """AKShare公开函数表，首次使用时导入AKShare并构建一次，替代反复的hasattr/getattr反射"""
+    return {
+        name: obj for name, obj in inspect.getmembers(load_akshare(), inspect.isfunction) if not name.startswith('_')
+    }
 
 
 # 定义AKShare函数的分类
@@ -45,6 +58,9 @@ class AKShareDynamicInputSchema(BaseModel):
     """AKShare动态工具的基础输入模式"""
     method_name: str = Field(description="要调用的AKShare方法名称，例如：stock_zh_a_hist")
     params: dict = Field(default={}, description="传递给AKShare方法的参数，格式为JSON对象")
+    cache: bool = Field(default=True, description="是否使用本地缓存，为False时强制重新获取数据")
+    columns: Optional[List[str]] = Field(default=None, description="只返回指定的列，例如：[\"日期\", \"收盘\"]，默认返回全部列")
+    serialization: Literal["list", "arrow"] = Field(default="list", description="表格数据格式：list为逐行列表，arrow为Arrow IPC字节流的base64编码，需要安装pyarrow")
 
 
 class AKShareDynamicTool(BaseTool):
@@ -66,67 +82,96 @@ class AKShareDynamicTool(BaseTool):
     @tool_kwargs_filter
     def _run(self, **kwargs) -> ActionOutput:
         """运行AKShare动态工具"""
+        method_name = kwargs.get("method_name", "")
+        params = kwargs.get("params", {})
+        use_cache = kwargs.get("cache", True)
+        columns = kwargs.get("columns")
+        serialization = kwargs.get("serialization", "list")
+        
+        if not method_name:
+            return ActionOutputError(msg="未提供AKShare方法名")
+        
         try:
-            method_name = kwargs.get("method_name", "")
-            params = kwargs.get("params", {})
-            
-            if not method_name:
-                return ActionOutputError(msg="未提供AKShare方法名")
-            
-            result = self.execute_akshare_method(method_name, params)
-            if isinstance(result, tuple) and len(result) == 2:
-                chart, df = result
-                tuple_result = action_output_charts_df_parse([(chart, df)])
-                charts = tuple_result[0]
-                if charts:
-                    return ActionOutput(any=charts)
-            
-            return ActionOutputError(msg=f"调用AKShare方法 {method_name} 未返回有效数据")
+            result = self.execute_akshare_method(method_name, params, use_cache, columns, serialization)
         except Exception as e:
-            logging.error(str(e))
+            logger.error("调用AKShare方法 %s 失败: %s", method_name, e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return ActionOutputError(msg=f"调用AKShare方法失败: {str(e)}")
+        
+        charts, dfs = action_output_charts_df_parse([result])
+        if charts:
+            return table_action_output(charts, dfs)
+        return ActionOutputError(msg=f"调用AKShare方法 {method_name} 未返回有效数据")
     
-    def execute_akshare_method(self, method_name: str, params: Dict[str, Any]) -> Tuple[Chart, pd.DataFrame]:
+    async def _arun(self, **kwargs) -> ActionOutput:
+        """异步执行AKShare动态工具：放到线程池执行以免阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._run, **kwargs))
+
+    @classmethod
+    async def execute_batch(cls, requests: List[Tuple[str, Dict[str, Any]]]) -> List[ActionOutput]:
+        """
+        并发执行多个AKShare方法调用，总耗时接近最慢的一次调用
+        
+        Args:
+            requests: (方法名, 参数)元组列表
+            
+        Returns:
+            与requests顺序一致的ActionOutput列表
+        """
+        if not requests:
+            return []
+        tool = cls()
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=min(32, len(requests))) as executor:
+            futures = [
+                loop.run_in_executor(executor, functools.partial(tool._run, method_name=method_name, params=params))
+                for method_name, params in requests
+            ]
+            return list(await asyncio.gather(*futures))
+    
+    def execute_akshare_method(self, method_name: str, params: Dict[str, Any],
+                               use_cache: bool = True,
+                               columns: Optional[List[str]] = None,
+                               serialization: str = "list") -> Tuple[Chart, pd.DataFrame]:
         """
         执行指定的AKShare方法
         
         Args:
             method_name: AKShare方法名
             params: 传递给方法的参数
+            use_cache: 是否使用本地文件缓存
+            columns: 只返回的列名，为空时返回全部列
+            serialization: 表格数据格式，list或arrow
             
         Returns:
             图表和数据框的元组
         """
-        if not hasattr(ak, method_name):
-            raise ValueError(f"AKShare没有名为 {method_name} 的方法")
-        
         # 获取方法对象
-        method = getattr(ak, method_name)
+        method = ak_methods().get(method_name)
+        if method is None:
+            raise ValueError(f"AKShare没有名为 {method_name} 的方法")
         
         # 调用AKShare方法
         try:
-            df = method(**params)
+            df = cached_call(method_name, params, method_ttl(method_name), method, use_cache)
             
-            # 确保结果是DataFrame
-            if not isinstance(df, pd.DataFrame):
-                if isinstance(df, (list, tuple)) and len(df) > 0 and isinstance(df[0], pd.DataFrame):
-                    df = df[0]  # 有些AKShare方法返回DataFrame列表
-                else:
-                    raise ValueError(f"AKShare方法 {method_name} 没有返回DataFrame")
+            # 确保结果是DataFrame，有些AKShare方法返回DataFrame列表
+            df = unwrap_dataframe(df)
+            if df is None:
+                raise ValueError(f"AKShare方法 {method_name} 没有返回DataFrame")
             
             if not df.empty:
-                columns = df.columns.values.tolist()
-                result = {"labels": columns, "data": df.values.tolist()}
+                df = select_columns(df, columns)
+                result = df_table_data(df, serialization)
                 
                 # 创建图表
                 return Chart(
-                    type=ChartType.TABLE_WITH_HEADERS.value,
+                    type=TABLE_TYPE,
                     title=f"AKShare {method_name} 数据",
                     data=result,
                     source=[Source(
                         title="AKShare数据",
                         content=f"使用AKShare的 {method_name} 方法获取的数据",
-                        url="https://akshare.akfamily.xyz/"
+                        url=AKSHARE_URL
                     )],
                     labels=[f"AKShare {method_name} 数据"]
                 ), df
@@ -144,13 +189,12 @@ class AKShareDynamicTool(BaseTool):
         Returns:
             可用方法名称列表
         """
-        return [name for name, obj in inspect.getmembers(ak)
-                if inspect.isfunction(obj) and not name.startswith('_')]
+        return list(ak_methods())
     
     @staticmethod
     def get_method_info(method_name: str) -> Dict[str, Any]:
         """
-        获取指定AKShare方法的详细信息
+        获取指定AKShare方法的详细信息，结果在进程内缓存
         
         Args:
             method_name: 方法名称
@@ -158,26 +202,60 @@ class AKShareDynamicTool(BaseTool):
         Returns:
             包含方法信息的字典
         """
-        if not hasattr(ak, method_name):
-            return {"error": f"方法 {method_name} 不存在"}
-        
-        method = getattr(ak, method_name)
-        if not inspect.isfunction(method):
+        return _method_info_cached(method_name)
+
+
+@functools.lru_cache(maxsize=1)
+def get_dynamic_tool() -> AKShareDynamicTool:
+    """
+    返回进程内共享的AKShareDynamicTool实例，避免每次请求重复执行Pydantic校验
+    """
+    return AKShareDynamicTool()
+
+
+@functools.lru_cache(maxsize=None)
+def _method_info_cached(method_name: str) -> Dict[str, Any]:
+    """按方法名缓存AKShare方法的签名与文档信息"""
+    method = ak_methods().get(method_name)
+    if method is None:
+        if hasattr(load_akshare(), method_name):
             return {"error": f"{method_name} 不是一个函数"}
-        
-        sig = inspect.signature(method)
-        
-        return {
-            "name": method_name,
-            "doc": inspect.getdoc(method) or "无文档",
-            "parameters": {
-                name: {
-                    "annotation": str(param.annotation) if param.annotation != param.empty else "未知",
-                    "default": str(param.default) if param.default != param.empty else "必填",
-                }
-                for name, param in sig.parameters.items()
+        return {"error": f"方法 {method_name} 不存在"}
+    
+    sig = inspect.signature(method)
+    
+    return {
+        "name": method_name,
+        "doc": inspect.getdoc(method) or "无文档",
+        "parameters": {
+            name: {
+                "annotation": str(param.annotation) if param.annotation != param.empty else "未知",
+                "default": str(param.default) if param.default != param.empty else "必填",
             }
+            for name, param in sig.parameters.items()
         }
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _build_method_description(method_name: str) -> str:
+    """根据方法文档首行与参数列表生成AKShareMethodTool的描述，按方法名缓存"""
+    method_info = AKShareDynamicTool.get_method_info(method_name)
+    method_doc = method_info.get("doc", "")
+    
+    description_lines = []
+    method_desc = method_doc.partition("\n")[0] if method_doc else f"调用AKShare {method_name}方法获取数据"
+    description_lines.append(f"功能：{method_desc}")
+    description_lines.append(f"返回：调用AKShare {method_name}方法获取的数据")
+    
+    # 获取参数信息
+    params_info = method_info.get("parameters", {})
+    if params_info:
+        description_lines.append("参数：")
+        for param_name, param_info in params_info.items():
+            param_default = param_info.get("default", "必填")
+            description_lines.append(f"  - {param_name} - {param_default}")
+    return "\n".join(description_lines)
 
 
 class AKShareMethodToolSchema(BaseModel):
@@ -203,6 +281,7 @@ class AKShareMethodTool(BaseTool):
     name: str = ""
     description: str = ""
     args_schema: Optional[Type[BaseModel]] = None
+    method_name: str = ""
     
     def __init__(self, method_name: str):
         """
@@ -212,38 +291,15 @@ class AKShareMethodTool(BaseTool):
             method_name: AKShare方法名称
         """
         # 确认方法存在
-        if not hasattr(ak, method_name):
+        if method_name not in ak_methods():
             raise ValueError(f"AKShare没有名为 {method_name} 的方法")
         
-        # 获取方法对象和信息
-        method = getattr(ak, method_name)
-        method_info = AKShareDynamicTool.get_method_info(method_name)
-        method_doc = method_info.get("doc", "")
-        
-        # 生成方法描述
-        description_lines = []
-        method_desc = method_doc.split("\n")[0] if method_doc else f"调用AKShare {method_name}方法获取数据"
-        description_lines.append(f"功能：{method_desc}")
-        description_lines.append(f"返回：调用AKShare {method_name}方法获取的数据")
-        
-        # 获取参数信息
-        params_info = method_info.get("parameters", {})
-        if params_info:
-            description_lines.append("参数：")
-            for param_name, param_info in params_info.items():
-                param_default = param_info.get("default", "必填")
-                param_desc = f"{param_name} - {param_default}"
-                description_lines.append(f"  - {param_desc}")
-        
-        # 设置属性
-        self.name = f"akshare_method_{method_name}"
-        self.description = "\n".join(description_lines)
-        self._method = method
-        self._method_name = method_name
-        self._params_info = params_info
-        
-        # 初始化基类
-        super().__init__()
+        # 通过基类初始化设置工具属性
+        super().__init__(
+            name=f"akshare_method_{method_name}",
+            description=_build_method_description(method_name),
+            method_name=method_name,
+        )
     
     def _run(self, **kwargs) -> dict:
         """
@@ -256,34 +312,45 @@ class AKShareMethodTool(BaseTool):
             格式化后的方法执行结果
         """
         try:
-            # 调用AKShare方法
-            result = self._method(**kwargs)
+            # 调用AKShare方法，与其它AKShare工具一样经过文件缓存、限流与调用记录
+            result = cached_call(self.method_name, kwargs, method_ttl(self.method_name),
+                                 ak_methods()[self.method_name])
             
-            # 确保结果是DataFrame
-            if not isinstance(result, pd.DataFrame):
-                if isinstance(result, (list, tuple)) and len(result) > 0 and isinstance(result[0], pd.DataFrame):
-                    result = result[0]  # 有些AKShare方法返回DataFrame列表
-                else:
-                    return {"error": f"AKShare方法 {self._method_name} 没有返回DataFrame"}
+            # 确保结果是DataFrame，有些AKShare方法返回DataFrame列表
+            result = unwrap_dataframe(result)
+            if result is None:
+                return {"error": f"AKShare方法 {self.method_name} 没有返回DataFrame"}
             
             if not result.empty:
-                # 格式化输出结果
+                # 仅返回前10行数据，序列化前释放完整DataFrame的引用
+                n = result.shape[0]
+                cols = result.columns.tolist()
+                preview = result.head(10).to_dict(orient="records")
+                del result
                 return {
-                    "method": self._method_name,
-                    "data_shape": result.shape,
-                    "columns": result.columns.tolist(),
-                    "data": result.head(10).to_dict(orient="records"),  # 仅返回前10行数据
-                    "total_rows": len(result)
+                    "method": self.method_name,
+                    "data_shape": (n, len(cols)),
+                    "columns": cols,
+                    "data": preview,
+                    "total_rows": n
                 }
             else:
-                return {"error": f"AKShare方法 {self._method_name} 返回的DataFrame为空"}
+                return {"error": f"AKShare方法 {self.method_name} 返回的DataFrame为空"}
         except Exception as e:
-            logger.error(f"执行AKShare方法 {self._method_name} 出错: {str(e)}")
+            logger.error(f"执行AKShare方法 {self.method_name} 出错: {str(e)}")
             return {"error": str(e)}
     
     async def _arun(self, **kwargs):
-        """异步执行AKShare方法"""
-        return self._run(**kwargs)
+        """异步执行AKShare方法：AKShare基于阻塞的requests，放到线程池执行以免阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._run, **kwargs))
+
+
+@functools.lru_cache(maxsize=None)
+def get_method_tool(method_name: str) -> AKShareMethodTool:
+    """
+    按方法名返回共享的AKShareMethodTool实例，方法不存在时抛出ValueError
+    """
+    return AKShareMethodTool(method_name=method_name)
 
 
 def create_akshare_tool_for_method(method_name: str) -> Optional[BaseTool]:
@@ -296,79 +363,12 @@ def create_akshare_tool_for_method(method_name: str) -> Optional[BaseTool]:
     Returns:
         创建的工具实例，如果方法不存在则返回None
     """
-    if not hasattr(ak, method_name):
+    if method_name not in ak_methods():
         logger.error(f"AKShare没有名为 {method_name} 的方法")
         return None
     
     try:
-        # 获取方法对象和信息
-        akshare_method = getattr(ak, method_name)
-        method_info = AKShareDynamicTool.get_method_info(method_name)
-        method_doc = method_info.get("doc", "")
-        
-        # 生成方法描述
-        description_lines = []
-        method_desc = method_doc.split("\n")[0] if method_doc else f"调用AKShare {method_name}方法获取数据"
-        description_lines.append(f"功能：{method_desc}")
-        description_lines.append(f"返回：调用AKShare {method_name}方法获取的数据")
-        
-        # 获取参数信息
-        params_info = method_info.get("parameters", {})
-        if params_info:
-            description_lines.append("参数：")
-            for param_name, param_info in params_info.items():
-                param_default = param_info.get("default", "必填")
-                param_desc = f"{param_name} - {param_default}"
-                description_lines.append(f"  - {param_desc}")
-                
-        # 创建专门的工具类
-        class AKShareMethodToolForMethod(BaseTool):
-            name = f"akshare_method_{method_name}"
-            description = "\n".join(description_lines)
-            
-            def _run(self, **kwargs) -> dict:
-                """
-                运行AKShare方法
-                
-                Args:
-                    **kwargs: 传递给AKShare方法的参数
-                    
-                Returns:
-                    格式化后的方法执行结果
-                """
-                try:
-                    # 调用AKShare方法
-                    result = akshare_method(**kwargs)
-                    
-                    # 确保结果是DataFrame
-                    if not isinstance(result, pd.DataFrame):
-                        if isinstance(result, (list, tuple)) and len(result) > 0 and isinstance(result[0], pd.DataFrame):
-                            result = result[0]  # 有些AKShare方法返回DataFrame列表
-                        else:
-                            return {"error": f"AKShare方法 {method_name} 没有返回DataFrame"}
-                    
-                    if not result.empty:
-                        # 格式化输出结果
-                        return {
-                            "method": method_name,
-                            "data_shape": result.shape,
-                            "columns": result.columns.tolist(),
-                            "data": result.head(10).to_dict(orient="records"),  # 仅返回前10行数据
-                            "total_rows": len(result)
-                        }
-                    else:
-                        return {"error": f"AKShare方法 {method_name} 返回的DataFrame为空"}
-                except Exception as e:
-                    logger.error(f"执行AKShare方法 {method_name} 出错: {str(e)}")
-                    return {"error": str(e)}
-            
-            async def _arun(self, **kwargs):
-                """异步执行AKShare方法"""
-                return self._run(**kwargs)
-        
-        # 创建并返回工具实例
-        return AKShareMethodToolForMethod()
-        
+        return get_method_tool(method_name)
     except Exception as e:
         logger.error(f"为方法 {method_name} 创建工具时出错: {str(e)}")
         return None
@@ -2,32 +2,33 @@
 """
 @Desc    : AKShare Fund Tool - Fetches fund information using AKShare
 """
+import asyncio
+import functools
 import logging
 import pandas as pd
 from langchain_core.tools import BaseTool
 from pydantic import Field, BaseModel
-from typing import Type, List, Union, Tuple, Optional
+from typing import Type, List, Union, Tuple, Optional, Literal
 
+from llmcompiler.tools.basetool._akshare_cache import cached_call, TTL_FUND_NAV
+from llmcompiler.tools.basetool._akshare_session import load_akshare
+from llmcompiler.tools.basetool._akshare_utils import df_table_data, select_columns, table_action_output, AKSHARE_URL, TABLE_TYPE
 from llmcompiler.tools.configure.tool_decorator import tool_kwargs_filter, tool_set_pydantic_default
-from llmcompiler.tools.generic.action_output import ChartType, Chart, \
-    action_output_charts_df_parse, Source
+from llmcompiler.tools.generic.action_output import Chart, action_output_charts_df_parse, Source
 from llmcompiler.tools.generic.action_output import ActionOutput, ActionOutputError
 from llmcompiler.tools.generic.render_description import render_text_description
 
 logger = logging.getLogger(__name__)
 
-try:
-    import akshare as ak
-except ImportError:
-    raise ImportError(
-        "The 'akshare' package is required to use this class. Please install it using 'pip install akshare'.")
-
 
 class FundInfoInputSchema(BaseModel):
     symbol: str = Field(description="基金代码，例如：000001 或者 110011")
     indicator: str = Field(default="单位净值走势", description="指标类型，可选值：单位净值走势, 累计净值走势, 累计收益率走势, 同类排名走势, 同类排名百分比, 分红送配详情, 拆分详情")
     start_date: str = Field(default="", description="开始日期，格式：YYYY-MM-DD")
     end_date: str = Field(default="", description="结束日期，格式：YYYY-MM-DD")
+    cache: bool = Field(default=True, description="是否使用本地缓存，为False时强制重新获取数据")
+    columns: Optional[List[str]] = Field(default=None, description="只返回指定的列，例如：[\"净值日期\", \"单位净值\"]，默认返回全部列")
+    serialization: Literal["list", "arrow"] = Field(default="list", description="表格数据格式：list为逐行列表，arrow为Arrow IPC字节流的base64编码，需要安装pyarrow")
 
 
 class AKShareFundTool(BaseTool):
@@ -45,20 +46,27 @@ class AKShareFundTool(BaseTool):
         """Use the tool."""
         try:
             result = self.chart(**kwargs)
-            tuple = action_output_charts_df_parse([result])
-            charts = tuple[0]
-            if charts:
-                return ActionOutput(any=charts)
         except Exception as e:
-            logging.error(str(e))
+            logger.error("获取基金数据失败: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        else:
+            charts, dfs = action_output_charts_df_parse([result])
+            if charts:
+                return table_action_output(charts, dfs)
         return ActionOutputError(
             msg="无法获取基金数据，请告知用户数据获取失败，并建议检查基金代码是否正确。")
 
+    async def _arun(self, **kwargs) -> ActionOutput:
+        """异步执行：AKShare基于阻塞的requests，放到线程池执行以免阻塞事件循环，多个工具可并发请求"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._run, **kwargs))
+
     def chart(self, **kwargs) -> Tuple[Chart, pd.DataFrame]:
         symbol = kwargs.get("symbol", "")
         indicator = kwargs.get("indicator", "单位净值走势")
         start_date = kwargs.get("start_date", "")
         end_date = kwargs.get("end_date", "")
+        use_cache = kwargs.get("cache", True)
+        columns = kwargs.get("columns")
+        serialization = kwargs.get("serialization", "list")
         
         try:
             # Map indicator to AKShare function parameters
@@ -75,23 +83,24 @@ class AKShareFundTool(BaseTool):
             ak_indicator = indicator_map.get(indicator, "单位净值走势")
             
             # Get fund data using AKShare
-            df = ak.fund_em_open_fund_info(fund=symbol, indicator=ak_indicator)
+            df = cached_call("fund_em_open_fund_info", {"fund": symbol, "indicator": ak_indicator},
+                             TTL_FUND_NAV, load_akshare().fund_em_open_fund_info, use_cache)
             
             # Filter by date if provided
             if start_date and end_date and '净值日期' in df.columns:
-                df['净值日期'] = pd.to_datetime(df['净值日期'])
-                df = df[(df['净值日期'] >= start_date) & (df['净值日期'] <= end_date)]
+                df['净值日期'] = pd.to_datetime(df['净值日期'], cache=True, errors="coerce")
+                df = df.loc[df['净值日期'].between(pd.Timestamp(start_date), pd.Timestamp(end_date))]
             
             if not df.empty:
-                columns = df.columns.values.tolist()
-                result = {"labels": columns, "data": df.values.tolist()}
+                df = select_columns(df, columns)
+                result = df_table_data(df, serialization)
                 return Chart(
-                    type=ChartType.TABLE_WITH_HEADERS.value,
+                    type=TABLE_TYPE,
                     title=f"基金 {symbol} {indicator}数据",
                     data=result,
                     source=[Source(title="AKShare基金数据", 
                                   content=f"基金 {symbol} 的{indicator}数据",
-                                  url="https://akshare.akfamily.xyz/")],
+                                  url=AKSHARE_URL)],
                     labels=["基金历史数据"]
                 ), df
             else:
@@ -101,6 +110,14 @@ class AKShareFundTool(BaseTool):
             raise
 
 
+@functools.lru_cache(maxsize=1)
+def get_fund_tool() -> AKShareFundTool:
+    """
+    返回进程内共享的AKShareFundTool实例，避免每次请求重复执行Pydantic校验
+    """
+    return AKShareFundTool()
+
+
 if __name__ == '__main__':
     info = AKShareFundTool()
     print(info.name)
@@ -2,39 +2,54 @@
 """
 @Desc    : AKShare Macro Tool - Fetches macroeconomic indicators using AKShare
 """
+import asyncio
+import functools
 import logging
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.tools import BaseTool
 from pydantic import Field, BaseModel
-from typing import Type, List, Union, Tuple, Optional
+from typing import Type, List, Union, Tuple, Optional, Dict, Literal
 
+from llmcompiler.tools.basetool._akshare_cache import cached_call, TTL_MACRO
+from llmcompiler.tools.basetool._akshare_session import load_akshare
+from llmcompiler.tools.basetool._akshare_utils import df_table_data, select_columns, table_action_output, AKSHARE_URL, TABLE_TYPE
 from llmcompiler.tools.configure.tool_decorator import tool_kwargs_filter, tool_set_pydantic_default
-from llmcompiler.tools.generic.action_output import ChartType, Chart, \
-    action_output_charts_df_parse, Source
+from llmcompiler.tools.generic.action_output import Chart, action_output_charts_df_parse, Source
 from llmcompiler.tools.generic.action_output import ActionOutput, ActionOutputError
 from llmcompiler.tools.generic.render_description import render_text_description
+from llmcompiler.utils.thread.pool_executor import max_worker
 
 logger = logging.getLogger(__name__)
 
-try:
-    import akshare as ak
-except ImportError:
-    raise ImportError(
-        "The 'akshare' package is required to use this class. Please install it using 'pip install akshare'.")
+# 中国宏观经济指标与AKShare方法名的映射，调用时再从AKShare取方法
+_MACRO_CN: Dict[str, str] = {
+    "CPI": "macro_china_cpi_yearly",
+    "PPI": "macro_china_ppi_yearly",
+    "GDP": "macro_china_gdp_yearly",
+    "货币供应量": "macro_china_money_supply",
+    "社会融资规模存量": "macro_china_shrzgm",
+    "工业增加值": "macro_china_industrial_production_yearly",
+    "社会消费品零售总额": "macro_china_retail_sales_yearly",
+    "PMI": "macro_china_pmi_yearly",
+}
 
 
 class MacroInputSchema(BaseModel):
-    indicator: str = Field(description="宏观经济指标类型，可选值：CPI, PPI, GDP, 货币供应量, 社会融资规模存量, 工业增加值, 社会消费品零售总额, PMI")
+    indicator: Union[str, List[str]] = Field(description="宏观经济指标类型，可选值：CPI, PPI, GDP, 货币供应量, 社会融资规模存量, 工业增加值, 社会消费品零售总额, PMI；需要多个指标时传入列表，例如：[\"CPI\", \"PPI\"]")
     start_date: str = Field(default="", description="开始日期，格式：YYYY-MM-DD")
     end_date: str = Field(default="", description="结束日期，格式：YYYY-MM-DD")
     region: str = Field(default="中国", description="国家或地区，默认为中国")
+    cache: bool = Field(default=True, description="是否使用本地缓存，为False时强制重新获取数据")
+    columns: Optional[List[str]] = Field(default=None, description="只返回指定的列，例如：[\"日期\", \"今值\"]，默认返回全部列")
+    serialization: Literal["list", "arrow"] = Field(default="list", description="表格数据格式：list为逐行列表，arrow为Arrow IPC字节流的base64编码，需要安装pyarrow")
 
 
 class AKShareMacroTool(BaseTool):
     name = "akshare_macro_data"
     description = render_text_description(
         "功能：获取宏观经济数据，如CPI、PPI、GDP等重要经济指标。"
-        "输入参数：宏观经济指标类型（CPI, PPI, GDP, 货币供应量, 社会融资规模存量, 工业增加值, 社会消费品零售总额, PMI）；开始日期；结束日期；国家或地区。"
+        "输入参数：宏观经济指标类型（CPI, PPI, GDP, 货币供应量, 社会融资规模存量, 工业增加值, 社会消费品零售总额, PMI），可传入列表同时获取多个指标；开始日期；结束日期；国家或地区。"
         "返回值：返回宏观经济指标的历史数据。"
     )
     args_schema: Type[BaseModel] = MacroInputSchema
@@ -45,63 +60,65 @@ class AKShareMacroTool(BaseTool):
         """Use the tool."""
         try:
             result = self.chart(**kwargs)
-            tuple = action_output_charts_df_parse([result])
-            charts = tuple[0]
-            if charts:
-                return ActionOutput(any=charts)
         except Exception as e:
-            logging.error(str(e))
+            logger.error("获取宏观经济数据失败: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        else:
+            charts, dfs = action_output_charts_df_parse([result])
+            if charts:
+                return table_action_output(charts, dfs)
         return ActionOutputError(
             msg="无法获取宏观经济数据，请告知用户数据获取失败。")
 
-    def chart(self, **kwargs) -> Tuple[Chart, pd.DataFrame]:
+    async def _arun(self, **kwargs) -> ActionOutput:
+        """异步执行：AKShare基于阻塞的requests，放到线程池执行以免阻塞事件循环，多个工具可并发请求"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._run, **kwargs))
+
+    def chart(self, **kwargs) -> Tuple[Union[Chart, List[Chart]], Union[pd.DataFrame, List[pd.DataFrame]]]:
+        indicator = kwargs.get("indicator", "")
+        if isinstance(indicator, str) or not indicator:
+            return self.indicator_chart(**kwargs)
+
+        # 多个指标并发获取，总耗时接近最慢的一次请求
+        with ThreadPoolExecutor(max_workers=max_worker(min(8, len(indicator)))) as executor:
+            results = list(executor.map(lambda i: self.indicator_chart(**{**kwargs, "indicator": i}), indicator))
+        return [chart for chart, _ in results], [df for _, df in results]
+
+    def indicator_chart(self, **kwargs) -> Tuple[Chart, pd.DataFrame]:
         indicator = kwargs.get("indicator", "")
         start_date = kwargs.get("start_date", "")
         end_date = kwargs.get("end_date", "")
         region = kwargs.get("region", "中国")
+        use_cache = kwargs.get("cache", True)
+        columns = kwargs.get("columns")
+        serialization = kwargs.get("serialization", "list")
         
         try:
             df = None
             title = f"{region}{indicator}数据"
             
             # Get macroeconomic data based on indicator type
-            if indicator == "CPI":
-                df = ak.macro_china_cpi_yearly() if region == "中国" else None
-            elif indicator == "PPI":
-                df = ak.macro_china_ppi_yearly() if region == "中国" else None
-            elif indicator == "GDP":
-                df = ak.macro_china_gdp_yearly() if region == "中国" else None
-            elif indicator == "货币供应量":
-                df = ak.macro_china_money_supply() if region == "中国" else None
-            elif indicator == "社会融资规模存量":
-                df = ak.macro_china_shrzgm() if region == "中国" else None
-            elif indicator == "工业增加值":
-                df = ak.macro_china_industrial_production_yearly() if region == "中国" else None
-            elif indicator == "社会消费品零售总额":
-                df = ak.macro_china_retail_sales_yearly() if region == "中国" else None
-            elif indicator == "PMI":
-                df = ak.macro_china_pmi_yearly() if region == "中国" else None
-            else:
+            method_name = _MACRO_CN.get(indicator)
+            if method_name is None:
                 raise ValueError(f"Unsupported indicator: {indicator}")
+            df = cached_call(method_name, {}, TTL_MACRO, getattr(load_akshare(), method_name),
+                             use_cache) if region == "中国" else None
                 
             # Filter by date if provided
             if start_date and end_date and df is not None:
                 date_columns = [col for col in df.columns if '日期' in col or 'year' in col.lower()]
                 if date_columns:
-                    date_col = date_columns[0]
-                    df[date_col] = pd.to_datetime(df[date_col])
-                    df = df[(df[date_col] >= start_date) & (df[date_col] <= end_date)]
+                    df = filter_by_date(df, date_columns[0], start_date, end_date)
             
             if df is not None and not df.empty:
-                columns = df.columns.values.tolist()
-                result = {"labels": columns, "data": df.values.tolist()}
+                df = select_columns(df, columns)
+                result = df_table_data(df, serialization)
                 return Chart(
-                    type=ChartType.TABLE_WITH_HEADERS.value,
+                    type=TABLE_TYPE,
                     title=title,
                     data=result,
                     source=[Source(title="AKShare宏观经济数据", 
                                    content=f"{region}的{indicator}数据",
-                                   url="https://akshare.akfamily.xyz/")],
+                                   url=AKSHARE_URL)],
                     labels=["宏观经济数据"]
                 ), df
             else:
@@ -111,6 +128,36 @@ class AKShareMacroTool(BaseTool):
             raise
 
 
+def _is_year_column(col: pd.Series) -> bool:
+    """判断列是否为四位数年份：整数列要求取值都在1000~9999之间，字符串列要求都是四位数字"""
+    if pd.api.types.is_integer_dtype(col):
+        return bool(col.between(1000, 9999).all())
+    if pd.api.types.infer_dtype(col, skipna=True) == "string":
+        return bool(col.str.fullmatch(r"\d{4}", na=False).all())
+    return False
+
+
+def filter_by_date(df: pd.DataFrame, date_col: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    按日期范围筛选数据，返回新的DataFrame
+
+    年度序列直接按整数年份比较，无需逐个解析为Timestamp；日期、时间或日期字符串按时间比较
+    """
+    col = df[date_col]
+    if _is_year_column(col):
+        return df.loc[col.astype("int32").between(int(start_date[:4]), int(end_date[:4]))]
+    df = df.assign(**{date_col: pd.to_datetime(col, cache=True, errors="coerce")})
+    return df.loc[df[date_col].between(pd.Timestamp(start_date), pd.Timestamp(end_date))]
+
+
+@functools.lru_cache(maxsize=1)
+def get_macro_tool() -> AKShareMacroTool:
+    """
+    返回进程内共享的AKShareMacroTool实例，避免每次请求重复执行Pydantic校验
+    """
+    return AKShareMacroTool()
+
+
 if __name__ == '__main__':
     info = AKShareMacroTool()
     print(info.name)
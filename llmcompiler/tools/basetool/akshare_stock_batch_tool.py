@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : AKShare Stock Batch Tool - Fetches data for multiple stocks in one tool call
+"""
+import asyncio
+import functools
+import logging
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.tools import BaseTool
+from pydantic import Field, BaseModel
+from typing import Type, List, Union, Tuple, Optional, Literal, Dict
+
+from llmcompiler.tools.basetool._akshare_cache import cached_call, TTL_INTRADAY
+from llmcompiler.tools.basetool._akshare_session import load_akshare
+from llmcompiler.tools.basetool._akshare_utils import df_table_data, select_columns, table_action_output, AKSHARE_URL, TABLE_TYPE
+from llmcompiler.tools.basetool.akshare_stock_tool import get_stock_tool, _MARKET_PREFIXES
+from llmcompiler.tools.configure.tool_decorator import tool_kwargs_filter, tool_set_pydantic_default
+from llmcompiler.tools.generic.action_output import Chart, action_output_charts_df_parse, Source
+from llmcompiler.tools.generic.action_output import ActionOutput, ActionOutputError
+from llmcompiler.tools.generic.render_description import render_text_description
+from llmcompiler.utils.thread.pool_executor import max_worker
+
+logger = logging.getLogger(__name__)
+
+
+def failed_symbols_msg(failed: Dict[str, str]) -> str:
+    """列出获取失败的股票代码及原因"""
+    errors = "；".join(f"{symbol}（{error}）" for symbol, error in failed.items())
+    return f"以下股票数据获取失败，请检查股票代码是否正确：{errors}"
+
+
+class StockBatchInputSchema(BaseModel):
+    symbols: List[str] = Field(description="股票代码列表，例如：[\"000001\", \"sh600000\"]")
+    data_type: Literal["spot", "hist"] = Field(default="spot", description="数据类型：spot为实时行情，hist为历史K线")
+    period: str = Field(default="daily", description="K线周期，可选值：daily, weekly, monthly，仅hist有效")
+    start_date: str = Field(default="", description="开始日期，格式：YYYY-MM-DD，仅hist有效")
+    end_date: str = Field(default="", description="结束日期，格式：YYYY-MM-DD，仅hist有效")
+    adjust: str = Field(default="qfq", description="复权类型，可选值：qfq前复权, hfq后复权, 空字符串不复权，仅hist有效")
+    cache: bool = Field(default=True, description="是否使用本地缓存，为False时强制重新获取数据")
+    columns: Optional[List[str]] = Field(default=None, description="只返回指定的列，例如：[\"代码\", \"最新价\"]，默认返回全部列")
+    serialization: Literal["list", "arrow"] = Field(default="list", description="表格数据格式：list为逐行列表，arrow为Arrow IPC字节流的base64编码，需要安装pyarrow")
+
+
+class AKShareStockBatchTool(BaseTool):
+    name = "akshare_stock_batch"
+    description = render_text_description(
+        "功能：一次获取多只A股股票的数据，查询超过3只股票时优先使用本工具。"
+        "输入参数：股票代码列表；数据类型(spot实时行情, hist历史K线)；K线周期(daily, weekly, monthly)；开始日期；结束日期；复权类型(qfq, hfq, '')。"
+        "返回值：spot返回一张包含所有股票最新价、涨跌幅、成交量等信息的表格；hist返回每只股票各自的历史行情数据。"
+    )
+    args_schema: Type[BaseModel] = StockBatchInputSchema
+
+    @tool_set_pydantic_default
+    @tool_kwargs_filter
+    def _run(self, **kwargs) -> ActionOutput:
+        """Use the tool."""
+        error = ""
+        try:
+            if kwargs.get("data_type", "spot") == "hist":
+                charts, dfs, failed = self.hist_results(**kwargs)
+            else:
+                charts, dfs = action_output_charts_df_parse([self.chart(**kwargs)])
+                failed = {}
+        except Exception as e:
+            logger.error("批量获取股票数据失败: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            error = f"（{e}）"
+        else:
+            if charts:
+                output = table_action_output(charts, dfs)
+                if failed:
+                    # 部分股票获取失败时仍返回成功的数据，并告知LLM哪些代码失败
+                    output.msg = "\n".join(filter(None, [failed_symbols_msg(failed), output.msg]))
+                return output
+        return ActionOutputError(
+            msg=f"无法批量获取股票数据{error}，请告知用户数据获取失败，并建议检查股票代码是否正确。")
+
+    async def _arun(self, **kwargs) -> ActionOutput:
+        """异步执行：AKShare基于阻塞的requests，放到线程池执行以免阻塞事件循环，多个工具可并发请求"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._run, **kwargs))
+
+    def chart(self, **kwargs) -> Tuple[Union[Chart, List[Chart]], Union[pd.DataFrame, List[pd.DataFrame]]]:
+        if not kwargs.get("symbols"):
+            raise ValueError("No symbols provided")
+        if kwargs.get("data_type", "spot") == "spot":
+            return self.spot_chart(**kwargs)
+        return self.hist_chart(**kwargs)
+
+    def spot_chart(self, **kwargs) -> Tuple[Chart, pd.DataFrame]:
+        symbols = kwargs.get("symbols", [])
+        use_cache = kwargs.get("cache", True)
+        columns = kwargs.get("columns")
+        serialization = kwargs.get("serialization", "list")
+
+        # 实时行情接口一次返回全部A股，按代码筛选，N只股票只需一次请求
+        codes = [symbol[2:] if symbol[:2] in _MARKET_PREFIXES else symbol for symbol in symbols]
+        df = cached_call("stock_zh_a_spot_em", {}, TTL_INTRADAY, load_akshare().stock_zh_a_spot_em, use_cache)
+        df = df[df["代码"].isin(codes)]
+        if df.empty:
+            raise ValueError(f"No spot data found for symbols: {symbols}")
+
+        df = select_columns(df, columns)
+        return Chart(
+            type=TABLE_TYPE,
+            title=f"{len(df)} 只股票实时行情数据",
+            data=df_table_data(df, serialization),
+            source=[Source(title="AKShare股票实时行情",
+                           content=f"股票 {', '.join(codes)} 的实时行情数据",
+                           url=AKSHARE_URL)],
+            labels=["股票实时行情数据"]
+        ), df
+
+    def hist_chart(self, **kwargs) -> Tuple[List[Chart], List[pd.DataFrame]]:
+        charts, dfs, _ = self.hist_results(**kwargs)
+        return charts, dfs
+
+    def hist_results(self, **kwargs) -> Tuple[List[Chart], List[pd.DataFrame], Dict[str, str]]:
+        """
+        逐只股票获取历史行情，单只股票失败不影响其它股票，返回成功的图表、数据与失败股票的错误信息；
+        全部失败时抛出异常
+        """
+        symbols = kwargs.get("symbols", [])
+        if not symbols:
+            raise ValueError("No symbols provided")
+        params = {k: v for k, v in kwargs.items() if k not in ("symbols", "data_type")}
+        stock_tool = get_stock_tool()
+
+        def fetch(symbol: str):
+            try:
+                return stock_tool.chart(**params, symbol=symbol)
+            except Exception as e:
+                return e
+
+        # 历史行情没有批量接口，逐只股票并发获取，请求频率由数据源令牌桶控制
+        with ThreadPoolExecutor(max_workers=max_worker(min(8, len(symbols)))) as executor:
+            results = list(executor.map(fetch, symbols))
+
+        charts, dfs, failed = [], [], {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                failed[symbol] = str(result)
+            else:
+                charts.append(result[0])
+                dfs.append(result[1])
+        if not charts:
+            raise ValueError(failed_symbols_msg(failed))
+        return charts, dfs, failed
+
+
+@functools.lru_cache(maxsize=1)
+def get_stock_batch_tool() -> AKShareStockBatchTool:
+    """
+    返回进程内共享的AKShareStockBatchTool实例，避免每次请求重复执行Pydantic校验
+    """
+    return AKShareStockBatchTool()
+
+
+if __name__ == '__main__':
+    info = AKShareStockBatchTool()
+    print(info.name)
+    print(info.description)
+    print(info.args)
+    print(info._run(symbols=["000001", "600000", "300750"]))
@@ -2,25 +2,28 @@
 """
 @Desc    : AKShare Stock Tool - Fetches stock information using AKShare
 """
+import asyncio
+import datetime
+import functools
 import logging
 import pandas as pd
 from langchain_core.tools import BaseTool
 from pydantic import Field, BaseModel
-from typing import Type, List, Union, Tuple, Optional
+from typing import Type, List, Union, Tuple, Optional, Literal
 
+from llmcompiler.tools.basetool._akshare_cache import cached_call, TTL_INTRADAY, TTL_HISTORICAL
+from llmcompiler.tools.basetool._akshare_session import load_akshare
+from llmcompiler.tools.basetool._akshare_utils import df_table_data, select_columns, table_action_output, AKSHARE_URL, TABLE_TYPE
 from llmcompiler.tools.configure.tool_decorator import tool_kwargs_filter, tool_set_pydantic_default
-from llmcompiler.tools.generic.action_output import ChartType, Chart, \
-    action_output_charts_df_parse, Source
+from llmcompiler.tools.generic.action_output import Chart, action_output_charts_df_parse, Source
 from llmcompiler.tools.generic.action_output import ActionOutput, ActionOutputError
 from llmcompiler.tools.generic.render_description import render_text_description
 
 logger = logging.getLogger(__name__)
 
-try:
-    import akshare as ak
-except ImportError:
-    raise ImportError(
-        "The 'akshare' package is required to use this class. Please install it using 'pip install akshare'.")
+_MARKET_PREFIXES = frozenset({'sh', 'sz', 'bj'})
+# 股票代码首位与交易所的对应关系
+_FIRST_CHAR_MARKET = {'6': 'sh', '0': 'sz', '3': 'sz', '8': 'bj'}
 
 
 class StockInfoInputSchema(BaseModel):
@@ -29,6 +32,9 @@ class StockInfoInputSchema(BaseModel):
     start_date: str = Field(default="", description="开始日期，格式：YYYY-MM-DD")
     end_date: str = Field(default="", description="结束日期，格式：YYYY-MM-DD")
     adjust: str = Field(default="qfq", description="复权类型，可选值：qfq前复权, hfq后复权, 空字符串不复权")
+    cache: bool = Field(default=True, description="是否使用本地缓存，为False时强制重新获取数据")
+    columns: Optional[List[str]] = Field(default=None, description="只返回指定的列，例如：[\"日期\", \"收盘\"]，默认返回全部列")
+    serialization: Literal["list", "arrow"] = Field(default="list", description="表格数据格式：list为逐行列表，arrow为Arrow IPC字节流的base64编码，需要安装pyarrow")
 
 
 class AKShareStockTool(BaseTool):
@@ -46,60 +52,54 @@ class AKShareStockTool(BaseTool):
         """Use the tool."""
         try:
             result = self.chart(**kwargs)
-            tuple = action_output_charts_df_parse([result])
-            charts = tuple[0]
-            if charts:
-                return ActionOutput(any=charts)
         except Exception as e:
-            logging.error(str(e))
+            logger.error("获取股票数据失败: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        else:
+            charts, dfs = action_output_charts_df_parse([result])
+            if charts:
+                return table_action_output(charts, dfs)
         return ActionOutputError(
             msg="无法获取股票数据，请告知用户数据获取失败，并建议检查股票代码是否正确。")
 
+    async def _arun(self, **kwargs) -> ActionOutput:
+        """异步执行：AKShare基于阻塞的requests，放到线程池执行以免阻塞事件循环，多个工具可并发请求"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._run, **kwargs))
+
     def chart(self, **kwargs) -> Tuple[Chart, pd.DataFrame]:
         symbol = kwargs.get("symbol", "")
         period = kwargs.get("period", "daily")
         start_date = kwargs.get("start_date", "")
         end_date = kwargs.get("end_date", "")
         adjust = kwargs.get("adjust", "qfq")
+        use_cache = kwargs.get("cache", True)
+        columns = kwargs.get("columns")
+        serialization = kwargs.get("serialization", "list")
         
         try:
             # Stock data for A-shares using AKShare
-            if symbol.startswith(('sh', 'sz', 'bj')):
-                # Symbol already has prefix
-                market_code = symbol
-            else:
-                # Add market prefix by determining exchange
-                if symbol.startswith('6'):
-                    market_code = f"sh{symbol}"
-                elif symbol.startswith(('0', '3')):
-                    market_code = f"sz{symbol}"
-                elif symbol.startswith('8'):
-                    market_code = f"bj{symbol}"
-                else:
-                    market_code = symbol  # Use as is
-
-            if period == "daily":
-                df = ak.stock_zh_a_hist(symbol=market_code, period="daily", start_date=start_date, 
-                                         end_date=end_date, adjust=adjust)
-            elif period == "weekly":
-                df = ak.stock_zh_a_hist(symbol=market_code, period="weekly", start_date=start_date, 
-                                         end_date=end_date, adjust=adjust)
-            elif period == "monthly":
-                df = ak.stock_zh_a_hist(symbol=market_code, period="monthly", start_date=start_date, 
-                                         end_date=end_date, adjust=adjust)
-            else:
+            # 未带市场前缀时按代码首位补全交易所前缀，无法识别的代码原样使用
+            market_code = symbol if symbol[:2] in _MARKET_PREFIXES else f"{_FIRST_CHAR_MARKET.get(symbol[:1], '')}{symbol}"
+
+            if period not in ("daily", "weekly", "monthly"):
                 raise ValueError(f"Unsupported period: {period}")
+
+            # 结束日期早于今天的历史行情不会再变化，可以缓存更久
+            ttl = TTL_HISTORICAL if end_date and end_date < datetime.date.today().isoformat() else TTL_INTRADAY
+            df = cached_call("stock_zh_a_hist",
+                             {"symbol": market_code, "period": period, "start_date": start_date,
+                              "end_date": end_date, "adjust": adjust},
+                             ttl, load_akshare().stock_zh_a_hist, use_cache)
                 
             if not df.empty:
-                columns = df.columns.values.tolist()
-                result = {"labels": columns, "data": df.values.tolist()}
+                df = select_columns(df, columns)
+                result = df_table_data(df, serialization)
                 return Chart(
-                    type=ChartType.TABLE_WITH_HEADERS.value,
+                    type=TABLE_TYPE,
                     title=f"股票 {symbol} 历史行情数据",
                     data=result,
                     source=[Source(title="AKShare股票行情", 
                                    content=f"股票 {symbol} 的{period}行情数据",
-                                   url="https://akshare.akfamily.xyz/")],
+                                   url=AKSHARE_URL)],
                     labels=["股票历史行情数据"]
                 ), df
             else:
@@ -109,6 +109,14 @@ class AKShareStockTool(BaseTool):
             raise
 
 
+@functools.lru_cache(maxsize=1)
+def get_stock_tool() -> AKShareStockTool:
+    """
+    返回进程内共享的AKShareStockTool实例，避免每次请求重复执行Pydantic校验
+    """
+    return AKShareStockTool()
+
+
 if __name__ == '__main__':
     info = AKShareStockTool()
     print(info.name)
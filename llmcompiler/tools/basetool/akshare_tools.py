@@ -2,26 +2,167 @@
 """
 @Desc    : AKShare Tools Registry - A collection of all AKShare tools
 """
+import functools
 import logging
-from typing import List, Dict, Any
+import os
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple, Type
 from langchain_core.tools import BaseTool
+from pydantic import BaseModel
 
-from llmcompiler.tools.basetool.akshare_stock_tool import AKShareStockTool
-from llmcompiler.tools.basetool.akshare_fund_tool import AKShareFundTool
-from llmcompiler.tools.basetool.akshare_macro_tool import AKShareMacroTool
-from llmcompiler.tools.basetool.akshare_dynamic_tool import AKShareDynamicTool
-from llmcompiler.tools.basetool.akshare_category_tools import (
-    get_akshare_category_tools,
-    get_common_akshare_tools
-)
+from llmcompiler.tools.basetool._akshare_session import load_akshare
+from llmcompiler.tools.basetool._akshare_usage import ranked_methods
+from llmcompiler.tools.basetool.akshare_stock_tool import AKShareStockTool, get_stock_tool
+from llmcompiler.tools.basetool.akshare_stock_batch_tool import AKShareStockBatchTool, get_stock_batch_tool
+from llmcompiler.tools.basetool.akshare_fund_tool import AKShareFundTool, get_fund_tool
+from llmcompiler.tools.basetool.akshare_macro_tool import AKShareMacroTool, get_macro_tool
+from llmcompiler.tools.basetool.akshare_dynamic_tool import AKShareDynamicTool, get_dynamic_tool
 
 logger = logging.getLogger(__name__)
 
-try:
-    import akshare as ak
-except ImportError:
-    raise ImportError(
-        "The 'akshare' package is required to use this class. Please install it using 'pip install akshare'.")
+# 常用方法工具描述的默认Token预算，可通过环境变量AKSHARE_TOOLS_TOKEN_BUDGET配置
+DEFAULT_TOOLS_TOKEN_BUDGET = 2000
+
+
+class LazyToolProxy(BaseTool):
+    """
+    延迟实例化的工具代理：只持有名称、描述与参数结构，首次执行时才通过factory获取真实工具
+    
+    factory应返回进程内共享的工具实例（如`get_stock_tool`），代理本身不再缓存
+    """
+    name: str = ""
+    description: str = ""
+    args_schema: Optional[Type[BaseModel]] = None
+    factory: Callable[[], BaseTool]
+
+    @classmethod
+    def from_tool_class(cls, tool_cls: Type[BaseTool], factory: Callable[[], BaseTool]) -> "LazyToolProxy":
+        """从工具类字段的默认值读取名称、描述与参数结构，无需实例化工具类"""
+        fields = tool_cls.__fields__
+        return cls(
+            name=fields["name"].default,
+            description=fields["description"].default,
+            args_schema=fields["args_schema"].default,
+            factory=factory,
+        )
+
+    def _run(self, **kwargs):
+        return self.factory()._run(**kwargs)
+
+    async def _arun(self, **kwargs):
+        return await self.factory()._arun(**kwargs)
+
+
+# 工具名称与(工具类, 共享实例工厂)的映射
+_TOOL_FACTORIES: Dict[str, Tuple[Type[BaseTool], Callable[[], BaseTool]]] = {
+    "akshare_stock_data": (AKShareStockTool, get_stock_tool),
+    "akshare_stock_batch": (AKShareStockBatchTool, get_stock_batch_tool),
+    "akshare_fund_data": (AKShareFundTool, get_fund_tool),
+    "akshare_macro_data": (AKShareMacroTool, get_macro_tool),
+    "akshare_dynamic_tool": (AKShareDynamicTool, get_dynamic_tool),
+}
+
+
+def _lazy_tool(tool_name: str) -> LazyToolProxy:
+    tool_cls, factory = _TOOL_FACTORIES[tool_name]
+    return LazyToolProxy.from_tool_class(tool_cls, factory)
+
+
+def _tools_token_budget() -> int:
+    value = os.getenv("AKSHARE_TOOLS_TOKEN_BUDGET")
+    if not value:
+        return DEFAULT_TOOLS_TOKEN_BUDGET
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("AKSHARE_TOOLS_TOKEN_BUDGET=%s 不是整数，使用默认值 %s", value, DEFAULT_TOOLS_TOKEN_BUDGET)
+        return DEFAULT_TOOLS_TOKEN_BUDGET
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    按字符估算Token数：中文等非ASCII字符约1个Token，ASCII约4个字符1个Token。
+    工具列表构建时不使用tiktoken，避免离线环境首次加载词表时下载或超时
+    """
+    non_ascii = sum(1 for c in text if ord(c) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+def _lazy_common_tools(token_budget: int) -> List[BaseTool]:
+    """
+    常用方法工具的代理列表：名称与描述来自方法文档，AKShareMethodTool在首次执行时才创建
+    
+    方法按近期调用次数排序，之后补充内置的常用方法列表（没有调用记录时即为该列表），
+    依次加入直到工具描述的Token总数超出token_budget
+    """
+    from llmcompiler.tools.basetool.akshare_category_tools import COMMON_AKSHARE_METHODS
+    from llmcompiler.tools.basetool.akshare_dynamic_tool import (
+        ak_methods, _build_method_description, get_method_tool
+    )
+
+    methods = ak_methods()
+    # dict保持插入顺序并去重
+    candidates = dict.fromkeys(m for m in ranked_methods() if m in methods)
+    candidates.update(dict.fromkeys(COMMON_AKSHARE_METHODS))
+
+    tools = []
+    used_tokens = 0
+    for method_name in candidates:
+        if method_name not in methods:
+            logger.error(f"AKShare没有名为 {method_name} 的方法")
+            continue
+        description = _build_method_description(method_name)
+        used_tokens += _estimate_tokens(description)
+        if used_tokens > token_budget:
+            break
+        tools.append(LazyToolProxy(
+            name=f"akshare_method_{method_name}",
+            description=description,
+            factory=functools.partial(get_method_tool, method_name),
+        ))
+    return tools
+
+
+@functools.lru_cache(maxsize=1)
+def _essential_tools() -> Tuple[BaseTool, ...]:
+    return (
+        _lazy_tool("akshare_stock_data"),
+        _lazy_tool("akshare_stock_batch"),
+        _lazy_tool("akshare_fund_data"),
+        _lazy_tool("akshare_macro_data"),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _dynamic_tools() -> Tuple[BaseTool, ...]:
+    return (_lazy_tool("akshare_dynamic_tool"),)
+
+
+@functools.lru_cache(maxsize=1)
+def _common_tools() -> Tuple[BaseTool, ...]:
+    return tuple(_lazy_common_tools(token_budget=_tools_token_budget()))
+
+
+@functools.lru_cache(maxsize=1)
+def _category_tools() -> Tuple[BaseTool, ...]:
+    from llmcompiler.tools.basetool.akshare_category_tools import get_akshare_category_tools
+    return tuple(get_akshare_category_tools())
+
+
+_TOOL_BUILDERS: Dict[str, Callable[[], Tuple[BaseTool, ...]]] = {
+    "essential": _essential_tools,
+    "dynamic": _dynamic_tools,
+    "common": _common_tools,
+    "categories": _category_tools,
+}
+_PART_LABELS = {"essential": "基本", "dynamic": "动态", "common": "常用", "categories": "分类"}
+# 各工具模式包含的工具组
+_MODE_SPEC: Dict[str, Tuple[str, ...]] = {
+    "essential": ("essential",),
+    "common": ("essential", "dynamic", "common"),
+    "categories": ("essential", "dynamic", "categories"),
+    "full": ("essential", "dynamic", "common", "categories"),
+}
 
 
 def get_akshare_tools(tool_mode: str = "essential") -> List[BaseTool]:
@@ -38,80 +179,56 @@ def get_akshare_tools(tool_mode: str = "essential") -> List[BaseTool]:
     Returns:
         AKShare工具列表
     """
-    # 基本工具
-    essential_tools = [
-        AKShareStockTool(),
-        AKShareFundTool(),
-        AKShareMacroTool(),
-    ]
-    
-    if tool_mode == "essential":
-        logger.info(f"已注册 {len(essential_tools)} 个基本AKShare工具")
-        return essential_tools
-    
-    # 将基本工具添加到结果列表
-    result_tools = essential_tools.copy()
-    
-    # 添加动态工具
-    dynamic_tool = AKShareDynamicTool()
-    result_tools.append(dynamic_tool)
-    
-    if tool_mode == "common":
-        # 添加常用工具
-        common_tools = get_common_akshare_tools(max_tools=20)
-        result_tools.extend(common_tools)
-        logger.info(f"已注册 {len(result_tools)} 个AKShare工具 (基本 + 动态 + 常用)")
-        return result_tools
-    
-    elif tool_mode == "categories":
-        # 添加分类工具
-        category_tools = get_akshare_category_tools()
-        result_tools.extend(category_tools)
-        logger.info(f"已注册 {len(result_tools)} 个AKShare工具 (基本 + 动态 + 分类)")
-        return result_tools
-    
-    elif tool_mode == "full":
-        # 添加常用工具和分类工具
-        common_tools = get_common_akshare_tools(max_tools=20)
-        category_tools = get_akshare_category_tools()
-        result_tools.extend(common_tools)
-        result_tools.extend(category_tools)
-        logger.info(f"已注册 {len(result_tools)} 个AKShare工具 (基本 + 动态 + 常用 + 分类)")
-        return result_tools
-    
-    else:
+    parts = _MODE_SPEC.get(tool_mode)
+    if parts is None:
         logger.warning(f"未知工具模式: {tool_mode}，使用默认模式 'essential'")
-        return essential_tools
+        parts = _MODE_SPEC["essential"]
+    
+    # 各组工具在进程内只构建一次，"full"模式复用"common"/"categories"已构建的结果
+    tools = [tool for part in parts for tool in _TOOL_BUILDERS[part]()]
+    logger.info(f"已注册 {len(tools)} 个AKShare工具 ({' + '.join(_PART_LABELS[part] for part in parts)})")
+    return tools
+
+
+# 统计信息缓存秒数：AKShare版本与方法分类在进程内基本不变
+STATS_TTL = 300
+_stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
 
 
 def get_akshare_tool_stats() -> Dict[str, Any]:
     """
-    获取AKShare工具统计信息
+    获取AKShare工具统计信息，成功结果在进程内缓存STATS_TTL秒
     
     Returns:
         包含工具统计信息的字典
     """
+    global _stats_cache
+    now = time.monotonic()
+    cached = _stats_cache
+    if cached is not None and now - cached[0] < STATS_TTL:
+        return dict(cached[1])
+    stats = _compute_akshare_tool_stats()
+    if "error" not in stats:
+        _stats_cache = (now, stats)
+    return dict(stats)
+
+
+def _compute_akshare_tool_stats() -> Dict[str, Any]:
+    """统计AKShare方法分类与常用方法数量"""
     try:
-        from llmcompiler.tools.basetool.akshare_category_tools import get_akshare_methods_by_category
+        from llmcompiler.tools.basetool.akshare_category_tools import (
+            get_akshare_methods_by_category, COMMON_AKSHARE_METHODS
+        )
         
-        # 获取分类后的方法
-        categorized_methods = get_akshare_methods_by_category()
-        
-        # 计算每个分类的方法数量
-        category_counts = {cat: len(methods) for cat, methods in categorized_methods.items()}
-        
-        # 计算总方法数
+        # 分类结果在进程内缓存，常用方法为静态列表，无需再次反射AKShare
+        category_counts = {cat: len(methods) for cat, methods in get_akshare_methods_by_category().items()}
         total_methods = sum(category_counts.values())
         
-        # 获取常用方法
-        from llmcompiler.tools.basetool.akshare_category_tools import get_common_akshare_methods
-        common_methods = get_common_akshare_methods()
-        
         return {
             "total_methods": total_methods,
             "category_counts": category_counts,
-            "common_method_count": len(common_methods),
-            "akshare_version": ak.__version__
+            "common_method_count": len(COMMON_AKSHARE_METHODS),
+            "akshare_version": load_akshare().__version__
         }
     except Exception as e:
         logger.error(f"获取AKShare工具统计信息时出错: {str(e)}")
@@ -5,10 +5,23 @@
 @Time    : 2024-08-02 09:30:49
 """
 import datetime
+import time
 from typing import Dict, List, Optional
 from langchain.tools import BaseTool
 from pydantic.v1 import BaseModel, Field
 
+_UTC = datetime.timezone.utc
+# 时区参数到(tzinfo, 说明)的映射，tzinfo为None表示本地时区；未列出的写法再按小写匹配，仍未命中则使用本地时区
+_LOCAL_TZ = (None, "本地时区")
+_TZ_DISPATCH = {"utc": (_UTC, "UTC"), "UTC": (_UTC, "UTC"), "local": _LOCAL_TZ, "": _LOCAL_TZ}
+
+# GetDateInfo结果按秒缓存：(秒级时间戳, 结果)，字段精度为秒，同一秒内的结果相同
+_date_info_cache = (0, {})
+_DEFAULT_FMT = "%Y-%m-%d %H:%M:%S"
+_WEEKDAY_NAMES = ("星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日")
+# 月份(1-12)对应的季度，下标0占位
+_MONTH_TO_QUARTER = (0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4)
+
 
 class TimeToolBase(BaseTool):
     """时间工具基类"""
@@ -30,20 +43,19 @@ class GetCurrentTime(TimeToolBase):
 返回:
 - 指定格式的当前时间字符串"""
     
-    def _run(self, format: str = "%Y-%m-%d %H:%M:%S", timezone: str = "local", **kwargs) -> str:
+    def _run(self, format: str = _DEFAULT_FMT, timezone: str = "local", **kwargs) -> str:
         """执行工具逻辑"""
-        print("================================ GetCurrentTime {format} ================================")
-        if timezone.lower() == "utc":
-            current_time = datetime.datetime.now(datetime.UTC)
-            timezone_info = "UTC"
-        else:  # 默认使用本地时区
-            current_time = datetime.datetime.now()
-            timezone_info = "本地时区"
+        tz, timezone_info = _TZ_DISPATCH.get(timezone) or _TZ_DISPATCH.get(timezone.lower(), _LOCAL_TZ)
+        current_time = datetime.datetime.now(tz)
         
-        formatted_time = current_time.strftime(format)
+        if format == _DEFAULT_FMT:
+            # 默认格式与isoformat一致，截去时区偏移即可，无需strftime
+            formatted_time = current_time.isoformat(sep=" ", timespec="seconds")[:19]
+        else:
+            formatted_time = current_time.strftime(format)
         return f"{formatted_time} ({timezone_info})"
     
-    async def _arun(self, format: str = "%Y-%m-%d %H:%M:%S", timezone: str = "local") -> str:
+    async def _arun(self, format: str = _DEFAULT_FMT, timezone: str = "local") -> str:
         """异步执行工具逻辑"""
         return self._run(format, timezone)
 
@@ -58,33 +70,37 @@ class GetDateInfo(TimeToolBase):
     
     def _run(self, **kwargs) -> Dict[str, str]:
         """执行工具逻辑"""
-        now = datetime.datetime.now()
+        global _date_info_cache
+        sec = int(time.time())
+        cached_sec, cached = _date_info_cache
+        if sec == cached_sec:
+            return dict(cached)
+        
+        now = datetime.datetime.fromtimestamp(sec)
         
         # 获取当前是星期几
         weekday = now.weekday()
-        weekday_names = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
         
         # 判断是否周末
         is_weekend = weekday >= 5
         
-        # 判断当前季度
-        quarter = (now.month - 1) // 3 + 1
-        
-        # 格式化月份和日期，确保两位数
-        month_formatted = f"{now.month:02d}"
-        day_formatted = f"{now.day:02d}"
+        # 一次格式化得到'YYYY-MM-DD HH:MM:SS'，年月日等字段直接切片
+        full_time = now.isoformat(sep=" ", timespec="seconds")
+        date_part, time_part = full_time.split(" ")
         
-        return {
-            "year": str(now.year),
-            "month": month_formatted,
-            "day": day_formatted,
-            "weekday": weekday_names[weekday],
+        result = {
+            "year": full_time[:4],
+            "month": full_time[5:7],
+            "day": full_time[8:10],
+            "weekday": _WEEKDAY_NAMES[weekday],
             "is_weekend": "是" if is_weekend else "否",
-            "quarter": f"Q{quarter}",
-            "date": now.strftime("%Y-%m-%d"),
-            "time": now.strftime("%H:%M:%S"),
-            "full_time": now.strftime("%Y-%m-%d %H:%M:%S")
+            "quarter": f"Q{_MONTH_TO_QUARTER[now.month]}",
+            "date": date_part,
+            "time": time_part,
+            "full_time": full_time
         }
+        _date_info_cache = (sec, result)
+        return dict(result)
     
     async def _arun(self, **kwargs) -> Dict[str, str]:
         """异步执行工具逻辑"""
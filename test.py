@@ -6,7 +6,6 @@
 """
 
 import logging
-import sys
 from pprint import pprint
 
 # 配置日志
@@ -22,7 +21,6 @@ from llmcompiler.result.chat import ChatRequest
 from langchain_openai.chat_models.base import ChatOpenAI
 from llmcompiler.chat.run import RunLLMCompiler
 from llmcompiler.tools.tools import DefineTools
-from llmcompiler.utils.date.date import formatted_dt_now
 import os
 from llmcompiler.tools.basetool.akshare_tools import (
     get_akshare_tools,
@@ -59,8 +57,8 @@ def test_akshare_tools_loading():
     """测试AKShare工具加载功能"""
     print("\n=== 测试AKShare工具加载 ===")
 
-    # 测试不同模式下的工具加载
-    for mode in ["essential", "common", "categories", "full"]:
+    # 先加载full构建全部工具组，其余模式直接复用已缓存的工具组，不再重复反射AKShare方法
+    for mode in ["full", "essential", "common", "categories"]:
         try:
             tools = get_akshare_tools(tool_mode=mode)
             print(f"模式 '{mode}': 成功加载 {len(tools)} 个工具")
@@ -152,10 +150,6 @@ def test_llm_compiler():
 def test_llm_logging():
     """测试大模型返回的数据日志记录功能"""
     import logging
-    import os
-    import json
-    import sys
-    from langchain.schema import HumanMessage, SystemMessage
 
     # 设置日志级别为INFO，以显示所有API调用日志
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : TEST AKSHARE FILE CACHE
+"""
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from llmcompiler.tools.basetool._akshare_cache import FileCache
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class TestFileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = FileCache(self.tmp.name)
+        self.df = pd.DataFrame({"日期": ["2024-01-01", "2024-01-02"], "收盘": [10.5, 11.0]})
+
+    def _format(self, key):
+        base = os.path.join(self.tmp.name, "m", key)
+        return [ext for ext in ("feather", "pkl") if os.path.exists(f"{base}.{ext}")]
+
+    def test_make_key_ignores_param_order(self):
+        self.assertEqual(FileCache.make_key("m", {"a": 1, "b": 2}), FileCache.make_key("m", {"b": 2, "a": 1}))
+        self.assertNotEqual(FileCache.make_key("m", {"a": 1}), FileCache.make_key("n", {"a": 1}))
+
+    def test_ttl_expiry(self):
+        self.cache.set("m", "k", self.df, ttl=60)
+        pd.testing.assert_frame_equal(self.cache.get("m", "k"), self.df)
+        with mock.patch("llmcompiler.tools.basetool._akshare_cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(self.cache.get("m", "k"))
+
+    def test_missing_entry(self):
+        self.assertIsNone(self.cache.get("m", "missing"))
+
+    def test_pickle_fallback_without_feather(self):
+        with mock.patch.object(pd.DataFrame, "to_feather", side_effect=ImportError("pyarrow")):
+            self.cache.set("m", "k", self.df, ttl=60)
+        self.assertEqual(self._format("k"), ["pkl"])
+        pd.testing.assert_frame_equal(self.cache.get("m", "k"), self.df)
+
+    def test_pickle_fallback_for_mixed_types(self):
+        # 同一列混有数字与字符串时Arrow无法转换，退回pickle
+        df = pd.DataFrame({"代码": ["000001", "600000"], "备注": [1, "停牌"]})
+        self.cache.set("m", "k", df, ttl=60)
+        self.assertEqual(self._format("k"), ["pkl"])
+        pd.testing.assert_frame_equal(self.cache.get("m", "k"), df)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is required for the Feather format")
+    def test_feather_round_trip(self):
+        self.cache.set("m", "k", self.df, ttl=60)
+        self.assertEqual(self._format("k"), ["feather"])
+        pd.testing.assert_frame_equal(self.cache.get("m", "k"), self.df)
+
+    def test_get_or_compute_caches_non_empty_frames(self):
+        compute = mock.Mock(return_value=self.df)
+        for _ in range(2):
+            result = self.cache.get_or_compute("m", {"symbol": "000001"}, 60, compute)
+            pd.testing.assert_frame_equal(result, self.df)
+        compute.assert_called_once()
+
+        empty = mock.Mock(return_value=pd.DataFrame())
+        for _ in range(2):
+            self.cache.get_or_compute("m", {"symbol": "none"}, 60, empty)
+        self.assertEqual(empty.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
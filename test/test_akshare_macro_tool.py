@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : TEST AKSHARE MACRO DATE FILTER
+"""
+import datetime
+import unittest
+
+import pandas as pd
+
+from llmcompiler.tools.basetool.akshare_macro_tool import filter_by_date, _is_year_column
+
+
+class TestMacroDateFilter(unittest.TestCase):
+
+    def test_date_objects(self):
+        # CPI/PPI/GDP/PMI年度数据的日期列是datetime.date对象
+        df = pd.DataFrame({
+            "日期": [datetime.date(2021, 1, 15), datetime.date(2022, 1, 15), datetime.date(2023, 1, 15)],
+            "今值": [1.0, 2.0, 3.0],
+        })
+        result = filter_by_date(df, "日期", "2022-01-01", "2023-12-31")
+        self.assertEqual(result["今值"].tolist(), [2.0, 3.0])
+        # 不修改传入的DataFrame
+        self.assertIsInstance(df["日期"].iloc[0], datetime.date)
+
+    def test_date_strings(self):
+        df = pd.DataFrame({"日期": ["2021-06-01", "2022-06-01", None], "今值": [1.0, 2.0, 3.0]})
+        result = filter_by_date(df, "日期", "2022-01-01", "2022-12-31")
+        self.assertEqual(result["今值"].tolist(), [2.0])
+
+    def test_year_strings(self):
+        df = pd.DataFrame({"year": ["2020", "2021", "2022"], "value": [1, 2, 3]})
+        result = filter_by_date(df, "year", "2021-01-01", "2022-12-31")
+        self.assertEqual(result["value"].tolist(), [2, 3])
+
+    def test_year_integers(self):
+        df = pd.DataFrame({"year": [2020, 2021, 2022], "value": [1, 2, 3]})
+        result = filter_by_date(df, "year", "2020-01-01", "2021-12-31")
+        self.assertEqual(result["value"].tolist(), [1, 2])
+
+    def test_integer_column_that_is_not_a_year(self):
+        # 20210101这类整数、或与日期列同名的数值列不是四位年份，不能走年份快速路径
+        self.assertFalse(_is_year_column(pd.Series([20210101, 20220101])))
+        self.assertFalse(_is_year_column(pd.Series([1, 2, 3])))
+        self.assertFalse(_is_year_column(pd.Series([datetime.date(2021, 1, 1)])))
+
+
+if __name__ == '__main__':
+    unittest.main()
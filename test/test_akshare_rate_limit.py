@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : TEST AKSHARE RATE LIMIT
+"""
+import unittest
+from unittest import mock
+
+import requests
+
+from llmcompiler.tools.basetool import _akshare_rate_limit
+from llmcompiler.tools.basetool._akshare_rate_limit import TokenBucket, bucket_for, rate_limited, MAX_RETRIES
+
+
+class FakeClock:
+    """替代time.monotonic与time.sleep，sleep只推进时间不真正等待"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        for name in ("monotonic", "sleep"):
+            patcher = mock.patch(f"llmcompiler.tools.basetool._akshare_rate_limit.time.{name}",
+                                 getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_burst_is_served_without_waiting(self):
+        bucket = TokenBucket(rate=2.0, burst=3)
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_waits_for_refill_after_burst(self):
+        bucket = TokenBucket(rate=2.0, burst=3)
+        for _ in range(5):
+            bucket.acquire()
+        # 桶空后每个令牌需要等待1/rate秒
+        self.assertAlmostEqual(sum(self.clock.sleeps), 1.0)
+        self.assertAlmostEqual(self.clock.now, 1.0)
+
+    def test_tokens_do_not_exceed_burst(self):
+        bucket = TokenBucket(rate=2.0, burst=3)
+        bucket.acquire()
+        self.clock.now += 100
+        for _ in range(4):
+            bucket.acquire()
+        self.assertAlmostEqual(sum(self.clock.sleeps), 0.5)
+
+
+class TestRateLimited(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(_akshare_rate_limit, "backoff_sleep")
+        self.backoff_sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bucket = mock.Mock(spec=TokenBucket)
+        patcher = mock.patch.dict(_akshare_rate_limit._BUCKETS, {"default": self.bucket})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bucket_for(self):
+        self.assertEqual(bucket_for("stock_zh_a_spot_em"), "eastmoney")
+        self.assertEqual(bucket_for("stock_zh_a_hist"), "eastmoney")
+        self.assertEqual(bucket_for("stock_zh_a_spot_sina"), "sina")
+        self.assertEqual(bucket_for("macro_china_cpi"), "default")
+
+    def test_retries_connection_errors(self):
+        func = mock.Mock(side_effect=[requests.exceptions.ConnectionError("reset"), "ok"])
+        self.assertEqual(rate_limited("unknown")(func)(symbol="000001"), "ok")
+        self.assertEqual(func.call_count, 2)
+        func.assert_called_with(symbol="000001")
+        # 每次尝试（包括重试）都要先取令牌
+        self.assertEqual(self.bucket.acquire.call_count, 2)
+        self.backoff_sleep.assert_called_once_with(0)
+
+    def test_gives_up_after_max_retries(self):
+        func = mock.Mock(side_effect=requests.exceptions.Timeout("timeout"))
+        with self.assertRaises(requests.exceptions.Timeout):
+            rate_limited()(func)()
+        self.assertEqual(func.call_count, MAX_RETRIES + 1)
+
+    def test_other_errors_are_not_retried(self):
+        func = mock.Mock(side_effect=KeyError("代码"))
+        with self.assertRaises(KeyError):
+            rate_limited()(func)()
+        func.assert_called_once()
+        self.backoff_sleep.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : TEST AKSHARE STOCK BATCH TOOL
+"""
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from llmcompiler.tools.basetool import akshare_stock_batch_tool
+from llmcompiler.tools.basetool._akshare_utils import TABLE_TYPE
+from llmcompiler.tools.basetool.akshare_stock_batch_tool import AKShareStockBatchTool
+from llmcompiler.tools.generic.action_output import ActionOutputError, Chart
+
+SPOT_DF = pd.DataFrame({
+    "代码": ["000001", "600000", "300750"],
+    "名称": ["平安银行", "浦发银行", "宁德时代"],
+    "最新价": [10.5, 7.2, 180.0],
+})
+
+
+def _hist_chart(**kwargs):
+    symbol = kwargs["symbol"]
+    if symbol.startswith("999"):
+        raise ValueError(f"No data found for symbol: {symbol}")
+    df = pd.DataFrame({"日期": ["2024-01-02"], "收盘": [1.0]})
+    return Chart(type=TABLE_TYPE, title=symbol, data={}), df
+
+
+class TestStockBatchTool(unittest.TestCase):
+
+    def setUp(self):
+        self.tool = AKShareStockBatchTool()
+        patcher = mock.patch.object(akshare_stock_batch_tool, "load_akshare")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(akshare_stock_batch_tool, "cached_call", return_value=SPOT_DF)
+        self.cached_call = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_spot_filters_prefixed_symbols(self):
+        chart, df = self.tool.spot_chart(symbols=["sz000001", "sh600000"])
+        self.assertEqual(df["代码"].tolist(), ["000001", "600000"])
+        self.assertEqual(chart.title, "2 只股票实时行情数据")
+        # 多只股票只请求一次全市场行情
+        self.cached_call.assert_called_once()
+        self.assertEqual(self.cached_call.call_args.args[0], "stock_zh_a_spot_em")
+
+    def test_spot_selects_columns(self):
+        _, df = self.tool.spot_chart(symbols=["300750"], columns=["代码", "最新价"])
+        self.assertEqual(list(df.columns), ["代码", "最新价"])
+
+    def test_spot_unknown_symbols(self):
+        with self.assertRaises(ValueError):
+            self.tool.spot_chart(symbols=["999999"])
+
+    def test_empty_symbols_returns_error(self):
+        self.assertIsInstance(self.tool._run(symbols=[]), ActionOutputError)
+        self.cached_call.assert_not_called()
+
+    def _patch_stock_tool(self):
+        stock_tool = mock.Mock()
+        stock_tool.chart.side_effect = _hist_chart
+        patcher = mock.patch.object(akshare_stock_batch_tool, "get_stock_tool", return_value=stock_tool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return stock_tool
+
+    def test_hist_fetches_each_symbol(self):
+        stock_tool = self._patch_stock_tool()
+        charts, dfs = self.tool.hist_chart(symbols=["000001", "600000"], data_type="hist", period="weekly")
+        # 结果顺序与输入的股票代码一致
+        self.assertEqual([c.title for c in charts], ["000001", "600000"])
+        self.assertEqual(len(dfs), 2)
+        for call in stock_tool.chart.call_args_list:
+            self.assertEqual(call.kwargs["period"], "weekly")
+            self.assertNotIn("symbols", call.kwargs)
+            self.assertNotIn("data_type", call.kwargs)
+
+    def test_hist_keeps_symbols_that_succeed(self):
+        self._patch_stock_tool()
+        output = self.tool._run(symbols=["000001", "999999", "600000"], data_type="hist")
+        self.assertNotIsInstance(output, ActionOutputError)
+        self.assertEqual([c.title for c in output.any], ["000001", "600000"])
+        self.assertIn("999999", output.msg)
+        self.assertIn("No data found for symbol: 999999", output.msg)
+        self.assertNotIn("000001", output.msg)
+
+    def test_hist_all_symbols_fail(self):
+        self._patch_stock_tool()
+        output = self.tool._run(symbols=["999998", "999999"], data_type="hist")
+        self.assertIsInstance(output, ActionOutputError)
+        self.assertIn("999998", output.msg)
+        self.assertIn("999999", output.msg)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : TEST AKSHARE USAGE RANKING
+"""
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from llmcompiler.tools.basetool import _akshare_usage
+from llmcompiler.tools.basetool._akshare_usage import record_usage, ranked_methods
+from llmcompiler.tools.basetool.akshare_tools import _estimate_tokens
+
+
+class TestAKShareUsage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "usage.jsonl")
+        patcher = mock.patch.dict(os.environ, {"AKSHARE_USAGE_PATH": self.path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_no_log_means_cold_start(self):
+        self.assertEqual(ranked_methods(), [])
+
+    def test_ranked_by_call_count(self):
+        for method in ["a", "b", "b", "c", "b", "a"]:
+            record_usage(method)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"tool": "broken"\n')
+        self.assertEqual(ranked_methods(), ["b", "a", "c"])
+
+    def test_old_calls_are_ignored(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"tool": "old", "ts": time.time() - _akshare_usage.USAGE_WINDOW - 1}) + "\n")
+        record_usage("new")
+        self.assertEqual(ranked_methods(), ["new"])
+
+    def test_log_is_compacted(self):
+        with mock.patch.object(_akshare_usage, "MAX_USAGE_BYTES", 200), \
+                mock.patch.object(_akshare_usage, "MAX_USAGE_RECORDS", 3):
+            for i in range(10):
+                record_usage(f"m{i}")
+        with open(self.path, encoding="utf-8") as f:
+            tools = [json.loads(line)["tool"] for line in f]
+        self.assertLessEqual(len(tools), 6)
+        self.assertEqual(tools[-1], "m9")
+
+
+class TestEstimateTokens(unittest.TestCase):
+
+    def test_character_estimate(self):
+        self.assertEqual(_estimate_tokens(""), 0)
+        self.assertEqual(_estimate_tokens("abcd"), 1)
+        self.assertEqual(_estimate_tokens("获取股票数据"), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
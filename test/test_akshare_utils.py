@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : TEST AKSHARE TABLE OUTPUT
+"""
+import unittest
+
+import pandas as pd
+
+from llmcompiler.graph.plan_and_schedule import modify_action_output
+from llmcompiler.tools.basetool._akshare_utils import (
+    summarise_df, table_action_output, df_table_data, ARROW_DATA_KEY, TABLE_TYPE
+)
+from llmcompiler.tools.generic.action_output import Chart
+
+
+def _chart(df: pd.DataFrame, data: dict = None) -> Chart:
+    return Chart(type=TABLE_TYPE, title="测试表格", data=data if data is not None else df_table_data(df))
+
+
+class TestSummariseDf(unittest.TestCase):
+
+    def test_small_table_is_not_truncated(self):
+        df = pd.DataFrame({"日期": ["2024-01-01", "2024-01-02"], "收盘": [10.5, 11.0]})
+        text = summarise_df(df, max_rows=5)
+        self.assertIn("2024-01-02", text)
+        self.assertNotIn("截断", text)
+
+    def test_large_table_keeps_head_and_tail(self):
+        df = pd.DataFrame({"序号": range(100)})
+        text = summarise_df(df, max_rows=4)
+        for kept in ("0", "1", "98", "99"):
+            self.assertIn(kept, text.split())
+        self.assertNotIn("50", text.split())
+        self.assertIn("共100行", text)
+
+
+class TestTableActionOutput(unittest.TestCase):
+
+    def test_small_list_table_goes_to_prompt(self):
+        df = pd.DataFrame({"收盘": [1.0, 2.0]})
+        output = table_action_output([_chart(df)], [df], max_rows=5)
+        self.assertTrue(output.any_to_prompt)
+
+    def test_large_table_is_summarised(self):
+        df = pd.DataFrame({"收盘": range(50)})
+        output = table_action_output([_chart(df)], [df], max_rows=5)
+        self.assertFalse(output.any_to_prompt)
+        self.assertIn("共50行", output.msg)
+        # 完整数据仍保留在图表中
+        self.assertEqual(len(output.any[0].data["data"]), 50)
+
+    def test_arrow_payload_never_reaches_prompt(self):
+        df = pd.DataFrame({"收盘": [1.0, 2.0]})
+        chart = _chart(df, data={"labels": ["收盘"], ARROW_DATA_KEY: "QVJST1cx"})
+        output = table_action_output([chart], [df], max_rows=5)
+        self.assertFalse(output.any_to_prompt)
+        prompt = modify_action_output(output)
+        self.assertNotIn("QVJST1cx", prompt)
+        self.assertIn("收盘", prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : TEST CHART SERIALIZATION
+"""
+import json
+import unittest
+
+import pandas as pd
+
+from llmcompiler.graph.plan_and_schedule import _dumps_charts
+
+
+class TestDumpsCharts(unittest.TestCase):
+
+    def test_int_keys(self):
+        charts = [{"title": "t", "data": pd.Series(["a", "b"]).to_dict()}]
+        self.assertEqual(json.loads(_dumps_charts(charts))[0]["data"], {"0": "a", "1": "b"})
+
+    def test_timestamp_keys(self):
+        data = pd.Series([1, 2], index=pd.to_datetime(["2024-01-01", "2024-01-02"])).to_dict()
+        loaded = json.loads(_dumps_charts([{"title": "t", "data": data}]))
+        self.assertEqual(loaded[0]["data"]["2024-01-02 00:00:00"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
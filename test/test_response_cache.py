@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+@Desc    : TEST LLM RESPONSE CACHE AND RETRY POLICY
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from llmcompiler.custom_llms import response_cache
+from llmcompiler.custom_llms.response_cache import (
+    response_cache_key, get_cached_response, set_cached_response, clear_response_cache
+)
+from llmcompiler.custom_llms.retry import is_retriable, backoff_sleep, MAX_BACKOFF_SECONDS
+
+
+class _CacheTestCase(unittest.TestCase):
+    mode = "memory"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        env = mock.patch.dict(os.environ, {"LLM_CACHE": self.mode,
+                                           "LLM_CACHE_PATH": os.path.join(self.tmp.name, "llm_cache.db")})
+        env.start()
+        self._reset_disk()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(env.stop)
+        self.addCleanup(self._reset_disk)
+        response_cache._llm_response_cache.clear()
+
+    @staticmethod
+    def _reset_disk():
+        if response_cache._disk_conn is not None:
+            response_cache._disk_conn.close()
+        response_cache._disk_conn = None
+        response_cache._disk_failed = False
+
+
+class TestResponseCacheKey(unittest.TestCase):
+
+    def test_key_depends_on_request_params(self):
+        messages = [{"role": "user", "content": "你好"}]
+        key = response_cache_key("m", messages)
+        self.assertEqual(key, response_cache_key("m", [{"content": "你好", "role": "user"}]))
+        self.assertNotEqual(key, response_cache_key("m", messages, temperature=0.5))
+        self.assertNotEqual(response_cache_key("m", messages, max_tokens=16),
+                            response_cache_key("m", messages, max_tokens=4096))
+        self.assertNotEqual(response_cache_key("m", messages, base_url="https://a"),
+                            response_cache_key("m", messages, base_url="https://b"))
+
+
+class TestMemoryCache(_CacheTestCase):
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(get_cached_response(b"k"))
+        set_cached_response(b"k", "v")
+        self.assertEqual(get_cached_response(b"k"), "v")
+
+    def test_lru_eviction(self):
+        with mock.patch.object(response_cache, "MAX_CACHE_SIZE", 2):
+            set_cached_response(b"a", "1")
+            set_cached_response(b"b", "2")
+            # 访问a使b成为最久未使用的条目
+            get_cached_response(b"a")
+            set_cached_response(b"c", "3")
+        self.assertEqual(get_cached_response(b"a"), "1")
+        self.assertIsNone(get_cached_response(b"b"))
+        self.assertEqual(get_cached_response(b"c"), "3")
+
+    def test_no_disk_in_memory_mode(self):
+        set_cached_response(b"k", "v")
+        self.assertFalse(os.path.exists(os.environ["LLM_CACHE_PATH"]))
+
+
+class TestOffMode(_CacheTestCase):
+    mode = "off"
+
+    def test_nothing_is_cached(self):
+        set_cached_response(b"k", "v")
+        self.assertIsNone(get_cached_response(b"k"))
+
+
+class TestExactMode(_CacheTestCase):
+    mode = "exact"
+
+    def test_persisted_to_sqlite(self):
+        set_cached_response(b"k", "v")
+        # 清空进程内缓存并重新打开数据库，模拟新进程
+        response_cache._llm_response_cache.clear()
+        self._reset_disk()
+        self.assertEqual(get_cached_response(b"k"), "v")
+        # 从磁盘读取后回填进程内缓存
+        self.assertIn(b"k", response_cache._llm_response_cache)
+
+    def test_clear_removes_disk_entries(self):
+        set_cached_response(b"k", "v")
+        clear_response_cache()
+        self.assertIsNone(get_cached_response(b"k"))
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(status_code)
+        self.status_code = status_code
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_is_retriable(self):
+        self.assertTrue(is_retriable(_StatusError(429)))
+        self.assertTrue(is_retriable(_StatusError(503)))
+        self.assertFalse(is_retriable(_StatusError(400)))
+        self.assertFalse(is_retriable(ValueError("bad request")))
+        self.assertTrue(is_retriable(ConnectionError(), (ConnectionError,)))
+
+    def test_backoff_bounds(self):
+        with mock.patch("llmcompiler.custom_llms.retry.time.sleep") as sleep, \
+                mock.patch("llmcompiler.custom_llms.retry.random.random", return_value=0.5):
+            backoff_sleep(1)
+            backoff_sleep(3)
+            backoff_sleep(20)
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [2.5, 8.5, MAX_BACKOFF_SECONDS + 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
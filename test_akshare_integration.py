@@ -6,7 +6,6 @@ AKShare集成测试 - 测试AKShare工具的各种功能
 """
 
 import unittest
-import pandas as pd
 from pprint import pprint
 
 # 导入AKShare工具
@@ -10,7 +10,6 @@ from llmcompiler.tools.basetool.akshare_stock_tool import AKShareStockTool
 from llmcompiler.tools.basetool.akshare_fund_tool import AKShareFundTool
 from llmcompiler.tools.basetool.akshare_macro_tool import AKShareMacroTool
 from llmcompiler.tools.basetool.akshare_tools import get_akshare_tools
-from llmcompiler.tools.generic.action_output import ActionOutput
 
 
 class TestAKShareTools(unittest.TestCase):
@@ -25,10 +24,17 @@ class TestAKShareTools(unittest.TestCase):
         self.assertIn("akshare_fund_data", tool_names)
         self.assertIn("akshare_macro_data", tool_names)
 
+    @classmethod
+    def setUpClass(cls):
+        """Snapshot each tool's argument names once from its class-level args_schema, without instantiating the tool"""
+        cls.tool_args = {
+            tool_cls: set(tool_cls.__fields__["args_schema"].default.model_fields)
+            for tool_cls in (AKShareStockTool, AKShareFundTool, AKShareMacroTool)
+        }
+
     def test_stock_tool_args(self):
         """Test that stock tool has correct arguments"""
-        tool = AKShareStockTool()
-        args = tool.args
+        args = self.tool_args[AKShareStockTool]
         self.assertIn("symbol", args)
         self.assertIn("period", args)
         self.assertIn("start_date", args)
@@ -37,8 +43,7 @@ class TestAKShareTools(unittest.TestCase):
 
     def test_fund_tool_args(self):
         """Test that fund tool has correct arguments"""
-        tool = AKShareFundTool()
-        args = tool.args
+        args = self.tool_args[AKShareFundTool]
         self.assertIn("symbol", args)
         self.assertIn("indicator", args)
         self.assertIn("start_date", args)
@@ -46,8 +51,7 @@ class TestAKShareTools(unittest.TestCase):
 
     def test_macro_tool_args(self):
         """Test that macro tool has correct arguments"""
-        tool = AKShareMacroTool()
-        args = tool.args
+        args = self.tool_args[AKShareMacroTool]
         self.assertIn("indicator", args)
         self.assertIn("start_date", args)
         self.assertIn("end_date", args)